@@ -2,16 +2,21 @@
 import streamlit as st
 import base64
 import os
+import time
 import uuid
 from dotenv import load_dotenv
 from backend.story_generator import (
-    generate_emotion_story,
-    generate_ancestral_story,
+    stream_emotion_story,
+    stream_ancestral_story,
     generate_mythology_dialogue,
-    generate_cultural_story
+    stream_cultural_story
 )
 from backend.images_generator import generate_images_from_story
-from backend.scene_generator import create_slideshow_video
+from backend.scene_generator import VIDEO_SIZE
+from backend.media_pipeline import MediaPipeline
+from backend.artifact_store import get_artifact_store
+from backend.dialogue_memory import DialogueMemory, USER_SPEAKER
+from backend.dialogue_warm_pool import get_dialogue_pool
 
 load_dotenv()
 
@@ -21,6 +26,11 @@ st.set_page_config(
     layout="wide"
 )
 
+# One artifact namespace per browser session; old jobs are swept in the background
+get_artifact_store().start_sweeper()
+if "artifact_session" not in st.session_state:
+    st.session_state.artifact_session = uuid.uuid4().hex[:12]
+
 # Background setup
 def set_background(image_path="assets/images/background.jpg"):
     try:
@@ -115,6 +125,83 @@ def vertical_center():
     _, col, _ = st.columns([1, 3, 1])
     return col
 
+# Widgets inside a fragment rerun only the fragment, so opening a
+# full-size scene doesn't rerun (and regenerate) the whole page
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def full_size_viewer(images):
+    """Send a full-resolution scene to the browser only when it's asked for"""
+    labels = {f"Scene {img.scene_num}": img for img in images}
+    choice = st.selectbox("🔍 View full-size scene", ["—"] + list(labels))
+    if choice in labels:
+        st.image(labels[choice].read_bytes(), use_container_width=True, caption=choice)
+
+if _fragment:
+    full_size_viewer = _fragment(full_size_viewer)
+
+STREAM_REFRESH_SECONDS = 0.05
+
+def render_story_stream(chunks):
+    """Show story text as it arrives; re-render at most every 50ms"""
+    placeholder = st.empty()
+    story = ""
+    last_render = 0.0
+    
+    for chunk in chunks:
+        story += chunk
+        now = time.monotonic()
+        if now - last_render >= STREAM_REFRESH_SECONDS:
+            placeholder.markdown(f"<div class='story-container'>{story}▌</div>", 
+                                 unsafe_allow_html=True)
+            last_render = now
+    
+    story = story.strip()
+    placeholder.markdown(f"<div class='story-container'>{story}</div>", 
+                         unsafe_allow_html=True)
+    return story
+
+def live_segment():
+    """on_segment callback - shows the wise friend's reply while it streams in"""
+    placeholder = st.empty()
+    last_render = [0.0]
+    
+    def show(segment):
+        now = time.monotonic()
+        if now - last_render[0] >= STREAM_REFRESH_SECONDS:
+            placeholder.markdown(f"<div class='story-container'>{segment}▌</div>", 
+                                 unsafe_allow_html=True)
+            last_render[0] = now
+    return show
+
+def remember_wise_turn(memory, response):
+    """Store the wise friend's reply without the '<name> speaks:' prefix"""
+    wise = response["scenario"]["wise"]
+    segment = response["segment"]
+    prefix = f"{wise} speaks:"
+    if segment.startswith(prefix):
+        segment = segment[len(prefix):]
+    memory.add(wise, segment)
+
+def render_dialogue(memory):
+    """Older turns as a collapsed summary, the recent ones in full"""
+    if memory.summary:
+        with st.expander(f"📜 Earlier in the conversation ({memory.folded_turns} turns)"):
+            lines = list(memory.summary)
+            if memory.dropped:
+                lines.insert(0, f"<em>{memory.dropped} earliest turns not shown</em>")
+            st.markdown("<br>".join(lines), unsafe_allow_html=True)
+    
+    turns = []
+    for speaker, text in memory.recent_turns_list():
+        if speaker == USER_SPEAKER:
+            turns.append(f"<strong>You speak:</strong> {text}")
+        else:
+            turns.append(f"{speaker} speaks: {text}")
+    if turns:
+        dialogue_text = "<br><br>".join(turns)
+        st.markdown(f"<div class='story-container'>{dialogue_text}</div>", 
+                   unsafe_allow_html=True)
+
 def add_images_and_video(story, user_prompt=""):
     """Generate and display images and video"""
     
@@ -123,53 +210,89 @@ def add_images_and_video(story, user_prompt=""):
     
     st.markdown("---")
     
-    images_b64 = []
+    images = []
     valid_images = []
+    pipeline = None
+    
+    # Images, audio and video of this run share one job id
+    story_id = str(uuid.uuid4())[:8]
+    session_id = st.session_state.artifact_session
     
     # Generate Images
     if generate_images_enabled:
+        # Narration starts now and each image is prepared for the video as it
+        # arrives, so the video stage below only has to encode
+        pipeline = MediaPipeline(story_id, session=session_id, story=story,
+                                 effects=add_video_effects,
+                                 make_video=generate_video_enabled).start()
         try:
-            with st.spinner(f"🎨 Generating {num_images} images (this may take 2-3 minutes)..."):
-                # Pass user prompt for better context matching
-                images_b64 = generate_images_from_story(
-                    story_text=story, 
-                    num_images=num_images, 
-                    user_prompt=user_prompt
+            st.markdown("### 🖼️ Generated Images")
+            status = st.empty()
+            st.markdown("---")
+            
+            # Reserve one slot per scene in a responsive grid, then fill
+            # each slot the moment its image arrives
+            cols_per_row = 3
+            slots = []
+            for row_start in range(0, num_images, cols_per_row):
+                cols = st.columns(cols_per_row)
+                for col_idx in range(min(cols_per_row, num_images - row_start)):
+                    with cols[col_idx]:
+                        slots.append(st.empty())
+            
+            arrived = []
+            
+            def show_image(idx, img):
+                pipeline.add_image(idx, img)
+                arrived.append(idx)
+                # Grid gets the small rendition; full size is on demand below
+                try:
+                    preview = img.thumbnail()
+                except Exception:
+                    preview = img.read_bytes()
+                slots[idx].image(
+                    preview, 
+                    use_container_width=True,
+                    caption=f"Scene {idx + 1}"
                 )
+                status.info(f"🎨 {len(arrived)}/{num_images} images ready...")
+            
+            status.info(f"🎨 Generating {num_images} images...")
             
-            valid_images = [img for img in images_b64 if img is not None]
+            # Ask the backend for the video's frame size up front instead of
+            # letterboxing square images later
+            width, height = VIDEO_SIZE if generate_video_enabled else (1024, 1024)
+            
+            # Pass user prompt for better context matching
+            images = generate_images_from_story(
+                story_text=story, 
+                num_images=num_images, 
+                user_prompt=user_prompt,
+                deterministic_seeds=True,  # repeated topics come from the image cache
+                session=session_id,
+                job_id=story_id,
+                on_image=show_image,
+                width=width,
+                height=height
+            )
+            
+            valid_images = [img for img in images if img is not None]
             
             if valid_images:
-                st.success(f"✨ Successfully generated {len(valid_images)} images!")
-                
-                st.markdown("### 🖼️ Generated Images")
-                st.markdown("---")
-                
-                # Display in responsive grid
-                cols_per_row = 3
-                num_rows = (len(valid_images) + cols_per_row - 1) // cols_per_row
-                
-                for row in range(num_rows):
-                    cols = st.columns(cols_per_row)
-                    for col_idx in range(cols_per_row):
-                        img_idx = row * cols_per_row + col_idx
-                        if img_idx < len(valid_images):
-                            with cols[col_idx]:
-                                st.image(
-                                    f"data:image/png;base64,{valid_images[img_idx]}", 
-                                    use_container_width=True,
-                                    caption=f"Scene {img_idx + 1}"
-                                )
-                
+                status.success(f"✨ Successfully generated {len(valid_images)} images!")
+                if _fragment:
+                    full_size_viewer(valid_images)
                 st.markdown("---")
             else:
-                st.error("❌ Failed to generate images")
+                status.error("❌ Failed to generate images")
+                pipeline.close()
                 return
                 
         except Exception as e:
             st.error(f"❌ Image Generation Error: {str(e)}")
             import traceback
             st.code(traceback.format_exc())
+            pipeline.close()
             return
     
     # Generate Video
@@ -180,20 +303,14 @@ def add_images_and_video(story, user_prompt=""):
         status_text = st.empty()
         
         try:
-            status_text.text("🎬 Processing images...")
+            status_text.text("🎵 Finishing narration and frames...")
             progress_bar.progress(20)
             
-            story_id = str(uuid.uuid4())[:8]
-            
             status_text.text("🎥 Creating video with effects...")
             progress_bar.progress(50)
             
-            video_path = create_slideshow_video(
-                images_b64=valid_images,  # Use only valid images
-                sid=story_id, 
-                story=story,
-                effects=add_video_effects
-            )
+            # Waits for the narration / frame jobs started above, then encodes
+            video_path = pipeline.finish()
             
             progress_bar.progress(90)
             status_text.text("🎵 Adding audio narration...")
@@ -294,14 +411,12 @@ elif menu == "Emotion-Based Storytelling":
     
     if st.button("✨ Generate Story ✨", use_container_width=True):
         if idea.strip():
+            st.success(f"📖 Your {emotion} Story")
             with st.spinner("📝 Creating your story..."):
-                story = generate_emotion_story(
+                story = render_story_stream(stream_emotion_story(
                     emotion, idea, story_length, 
                     custom_words, custom_paragraphs
-                )
-                st.success(f"📖 Your {emotion} Story")
-                st.markdown(f"<div class='story-container'>{story}</div>", 
-                          unsafe_allow_html=True)
+                ))
                 
                 # Generate media with user prompt context
                 add_images_and_video(story, user_prompt=idea)
@@ -335,14 +450,12 @@ elif menu == "Ancestral Story":
     
     if st.button("🌿 Generate Legacy 🌿", use_container_width=True):
         if your_name and father and mother:
+            st.success("📖 Your Family Legacy")
             with st.spinner("📝 Creating your ancestral story..."):
-                story = generate_ancestral_story(
+                story = render_story_stream(stream_ancestral_story(
                     your_name, father, mother, grandpa, grandma, 
                     siblings, idea, story_length, custom_words, custom_paragraphs
-                )
-                st.success("📖 Your Family Legacy")
-                st.markdown(f"<div class='story-container'>{story}</div>", 
-                          unsafe_allow_html=True)
+                ))
                 
                 # Generate media
                 add_images_and_video(story, user_prompt=f"{your_name}'s family story")
@@ -369,10 +482,13 @@ elif menu == "Interactive Story":
         </div>
     """, unsafe_allow_html=True)
 
+    # Opening turns need no user input - have some ready before the click
+    get_dialogue_pool().warm()
+
     if "dialogue" not in st.session_state:
         st.session_state.dialogue = {
             "started": False, 
-            "history": [], 
+            "memory": DialogueMemory(), 
             "context": "", 
             "question": "", 
             "correct_answer": "", 
@@ -382,20 +498,20 @@ elif menu == "Interactive Story":
     if st.button("💬 Start Conversation 💬", use_container_width=True):
         st.session_state.dialogue = {
             "started": True, 
-            "history": [], 
+            "memory": DialogueMemory(), 
             "context": "", 
             "question": "", 
             "correct_answer": "", 
             "scenario": None
         }
         with st.spinner("💭 Your wise friend is ready to listen..."):
-            response = generate_mythology_dialogue()
+            response = get_dialogue_pool().take(on_segment=live_segment())
             if "error" in response:
                 st.warning(f"Starting with default greeting...")
             
             # Always proceed even with error
             if "segment" in response:
-                st.session_state.dialogue["history"].append(response["segment"])
+                remember_wise_turn(st.session_state.dialogue["memory"], response)
                 st.session_state.dialogue.update(response)
                 st.rerun()
 
@@ -405,10 +521,7 @@ elif menu == "Interactive Story":
             st.info(f"🙏 You are speaking with **{scenario['wise']}** - A wise friend who understands life's challenges")
 
         # Display conversation history
-        if st.session_state.dialogue["history"]:
-            dialogue_text = "<br><br>".join(st.session_state.dialogue["history"])
-            st.markdown(f"<div class='story-container'>{dialogue_text}</div>", 
-                       unsafe_allow_html=True)
+        render_dialogue(st.session_state.dialogue["memory"])
 
         # Input for user's response
         if st.session_state.dialogue.get("question"):
@@ -424,19 +537,23 @@ elif menu == "Interactive Story":
             with col1:
                 if st.button("💬 Continue Conversation", use_container_width=True):
                     if answer and answer.strip():
-                        # Add user's response to history
-                        st.session_state.dialogue["history"].append(f"<strong>You speak:</strong> {answer}")
+                        memory = st.session_state.dialogue["memory"]
                         
                         with st.spinner("🤔 Your friend is thinking..."):
                             response = generate_mythology_dialogue(
                                 st.session_state.dialogue["context"],
                                 answer,
                                 st.session_state.dialogue["correct_answer"],
-                                st.session_state.dialogue["scenario"]
+                                st.session_state.dialogue["scenario"],
+                                memory=memory,
+                                on_segment=live_segment()
                             )
                             
+                            # Add user's response to history
+                            memory.add(USER_SPEAKER, answer)
+                            
                             if "segment" in response:
-                                st.session_state.dialogue["history"].append(response["segment"])
+                                remember_wise_turn(memory, response)
                                 st.session_state.dialogue.update(response)
                                 st.rerun()
                             else:
@@ -482,14 +599,12 @@ elif menu == "Cultural Story":
     
     if st.button("📜 Generate True Story 📜", use_container_width=True):
         if topic:
+            st.success("📖 True Cultural History")
             with st.spinner("📝 Retrieving historical facts..."):
-                story = generate_cultural_story(
+                story = render_story_stream(stream_cultural_story(
                     topic, extra, story_length, 
                     custom_words, custom_paragraphs
-                )
-                st.success("📖 True Cultural History")
-                st.markdown(f"<div class='story-container'>{story}</div>", 
-                          unsafe_allow_html=True)
+                ))
                 
                 # Generate media with full context
                 full_context = f"{topic} {extra}" if extra else topic
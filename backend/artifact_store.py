@@ -0,0 +1,161 @@
+# backend/artifact_store.py
+# Session-namespaced storage for generated images, audio and videos
+# Layout: assets/<kind>/<session>/<job>/<file>  - old jobs are swept by TTL and size
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ARTIFACT_KINDS = ("images", "audio", "videos")
+
+DEFAULT_ROOT = "assets"
+DEFAULT_TTL_SECONDS = 6 * 60 * 60           # 6 hours
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+DEFAULT_PROTECT_SECONDS = 10 * 60           # never evict jobs touched in the last 10 minutes
+DEFAULT_SWEEP_INTERVAL = 10 * 60
+
+def _safe_name(value) -> str:
+    """Keep ids usable as a single path component"""
+    cleaned = re.sub(r"[^A-Za-z0-9_-]", "_", str(value or "")).strip("_")
+    return cleaned[:64] or "default"
+
+
+class ArtifactStore:
+    def __init__(self, root: str = DEFAULT_ROOT, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 protect_seconds: float = DEFAULT_PROTECT_SECONDS):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.protect_seconds = protect_seconds
+
+        self._sweeper = None
+        self._stop = threading.Event()
+        self._sweep_lock = threading.Lock()
+
+    def job_dir(self, kind: str, session_id, job_id) -> Path:
+        """Directory for one job's artifacts of a given kind (created on demand)"""
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        path = self.root / kind / _safe_name(session_id) / _safe_name(job_id)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def path_for(self, kind: str, session_id, job_id, filename: str) -> Path:
+        return self.job_dir(kind, session_id, job_id) / Path(filename).name
+
+    @contextmanager
+    def atomic_path(self, final_path):
+        """
+        Yield a temporary path next to final_path and move it into place
+        only if the block succeeds - readers never see half-written files.
+        """
+        final_path = Path(final_path)
+        fd, tmp = tempfile.mkstemp(dir=final_path.parent, prefix=".tmp_", suffix=final_path.suffix)
+        os.close(fd)
+        try:
+            yield tmp
+            if os.path.exists(tmp) and os.path.getsize(tmp) > 0:
+                os.replace(tmp, final_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def write_bytes(self, kind: str, session_id, job_id, filename: str, data: bytes) -> Path:
+        """Atomically write one artifact and return its final path"""
+        path = self.path_for(kind, session_id, job_id, filename)
+        with self.atomic_path(path) as tmp:
+            with open(tmp, "wb") as f:
+                f.write(data)
+        return path
+
+    def _job_dirs(self) -> list:
+        """All job directories as (newest_mtime, size_bytes, path)"""
+        jobs = []
+        for kind in ARTIFACT_KINDS:
+            kind_dir = self.root / kind
+            if not kind_dir.is_dir():
+                continue
+            for session_dir in kind_dir.iterdir():
+                if not session_dir.is_dir():
+                    continue
+                for job in session_dir.iterdir():
+                    if not job.is_dir():
+                        continue
+                    newest = job.stat().st_mtime
+                    size = 0
+                    for f in job.rglob("*"):
+                        try:
+                            st = f.stat()
+                        except OSError:
+                            continue
+                        newest = max(newest, st.st_mtime)
+                        if f.is_file():
+                            size += st.st_size
+                    jobs.append((newest, size, job))
+        return jobs
+
+    def sweep(self) -> dict:
+        """Delete expired jobs, then the oldest jobs until under the size budget"""
+        with self._sweep_lock:
+            now = time.time()
+            jobs = sorted(self._job_dirs(), key=lambda j: j[0])
+            total = sum(size for _, size, _ in jobs)
+            removed = 0
+            freed = 0
+
+            for newest, size, path in jobs:
+                age = now - newest
+                expired = self.ttl_seconds and age > self.ttl_seconds
+                over_budget = self.max_bytes and total > self.max_bytes
+                if not expired and not (over_budget and age > self.protect_seconds):
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                freed += size
+                removed += 1
+                try:
+                    path.parent.rmdir()  # drop empty session dir
+                except OSError:
+                    pass
+
+            if removed:
+                print(f"🧹 Artifact sweep: removed {removed} jobs ({freed / (1024 * 1024):.1f} MB)")
+
+            return {"removed_jobs": removed, "freed_bytes": freed, "total_bytes": total}
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️  Artifact sweep failed: {e}")
+
+    def start_sweeper(self, interval: float = DEFAULT_SWEEP_INTERVAL):
+        """Start the background sweeper thread (safe to call repeatedly)"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,),
+                                         name="artifact-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide store shared by all sessions"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore()
+        return _default_store
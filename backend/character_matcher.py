@@ -0,0 +1,208 @@
+# backend/character_matcher.py
+# Compiled character matcher - one word-boundary regex pass over the story
+# instead of a substring search per pattern per character
+
+import re
+import threading
+
+# Male characters - SPECIFIC names and descriptions
+MALE_PATTERNS = {
+    'Krishna': ['krishna', 'shri krishna', 'shree krishna', 'lord krishna'],
+    'Arjun': ['arjun', 'arjuna', 'arjuna warrior'],
+    'Ram': ['ram', 'rama', 'lord ram', 'shri ram'],
+    'Lakshman': ['lakshman', 'laxman', 'lakshmana'],
+    'Hanuman': ['hanuman', 'pawan putra'],
+    'Ravan': ['ravan', 'ravana', 'demon king'],
+    'Bheem': ['bheem', 'bheema', 'bhima'],
+    'Yudhishthir': ['yudhishthir', 'yudhishthira'],
+    'Karna': ['karna'],
+    'father': ['father', 'dad', 'papa', 'pita'],
+    'grandfather': ['grandfather', 'dada', 'nana', 'grandpa'],
+    'brother': ['brother', 'bhai'],
+    'son': ['son', 'beta', 'boy child'],
+    'boy': ['boy', 'young boy', 'male child'],
+    'friend_male': ['two boys', 'boy friends', 'male friends'],
+    'king': ['king', 'raja', 'emperor'],
+}
+
+# Female characters - SPECIFIC names and descriptions
+FEMALE_PATTERNS = {
+    'Sita': ['sita', 'sita devi', 'mata sita'],
+    'Draupadi': ['draupadi', 'panchali'],
+    'Radha': ['radha', 'radha rani'],
+    'Kunti': ['kunti', 'kunti devi'],
+    'mother': ['mother', 'mom', 'maa', 'mata'],
+    'grandmother': ['grandmother', 'dadi', 'nani', 'grandma'],
+    'sister': ['sister', 'bahen', 'didi'],
+    'daughter': ['daughter', 'beti', 'girl child'],
+    'girl': ['girl', 'young girl', 'female child'],
+    'friend_female': ['two girls', 'girl friends', 'female friends'],
+    'queen': ['queen', 'rani'],
+}
+
+# VERY SPECIFIC visual description for each character
+# MUST look exactly like the real/mythological figure
+CHARACTER_DESCRIPTIONS = {
+    # Male mythology characters - EXACT iconic appearance
+    'Krishna': 'Lord Krishna with BLUE SKIN COLOR, peacock feather in crown on head, yellow silk dhoti, holding bamboo flute, divine radiant smile, male god with dark blue complexion, traditional Indian deity appearance',
+    'Arjun': 'Arjuna the warrior prince, strong athletic male warrior, silver armor and warrior clothes, holding large bow with arrows on back, headband, brave determined face, male Pandava hero',
+    'Ram': 'Lord Rama with BLUE SKIN COLOR, bow and quiver of arrows, golden crown, royal yellow dhoti, calm noble face, male prince deity with dark blue complexion',
+    'Lakshman': 'Lakshmana, loyal brother warrior, male with armor, holding bow, traditional warrior dress, devoted expression, strong male companion',
+    'Hanuman': 'Hanuman the monkey god, RED-ORANGE BODY, muscular monkey face and tail, male monkey deity with devotional pose, powerful build',
+    'Ravan': 'Ravana demon king with TEN HEADS stacked vertically, golden crown on each head, fierce demonic face, male demon with dark complexion, multiple arms',
+    'Bheem': 'Bheema the strongest Pandava, VERY MUSCULAR male warrior, holding large mace weapon, massive build, powerful physique, warrior clothes',
+    'Karna': 'Karna the tragic hero, male archer warrior, GOLDEN KAVACH ARMOR covering chest, earrings, bow and arrows, noble warrior appearance',
+    
+    # Male family members
+    'father': 'Indian father, adult male, traditional kurta pajama, caring expression, male parent',
+    'grandfather': 'Indian grandfather, elderly male, white beard, traditional dhoti or kurta, wise old man',
+    'brother': 'young Indian boy, brother, traditional clothes, male sibling',
+    'son': 'young Indian boy child, son, traditional clothes for boys, male child',
+    'boy': 'young Indian boy, male child, simple traditional clothes, playful boy',
+    'friend_male': 'two young Indian boys, male friends, traditional boys clothes, playing together',
+    'king': 'Indian king, adult male, royal crown, royal robes, regal male ruler',
+    
+    # Female mythology characters - EXACT iconic appearance
+    'Sita': 'Sita Devi, beautiful Indian goddess, elegant RED AND GOLD SAREE, flower jewelry in hair, gentle serene face, divine female appearance, traditional goddess look',
+    'Draupadi': 'Draupadi the fire-born queen, beautiful strong Indian woman, DARK LONG HAIR, royal colorful saree, gold jewelry, fierce intelligent eyes, female Panchal princess',
+    'Radha': 'Radha Rani, beautiful devoted goddess, BLUE OR PINK SAREE, flower garlands, loving expression toward Krishna, elegant female deity',
+    'Kunti': 'Kunti Devi the queen mother, mature graceful Indian woman, royal saree, motherly wise face, traditional jewelry, elderly female queen',
+    
+    # Female family members
+    'mother': 'Indian mother, adult woman, beautiful saree, caring expression, female parent, maternal look',
+    'grandmother': 'Indian grandmother, elderly woman, white hair, traditional saree, wise old woman',
+    'sister': 'young Indian girl, sister, traditional dress or salwar, female sibling',
+    'daughter': 'young Indian girl child, daughter, traditional girls dress, female child',
+    'girl': 'young Indian girl, female child, traditional dress, playful girl',
+    'friend_female': 'two young Indian girls, female friends, traditional girls clothes, playing together',
+    'queen': 'Indian queen, adult woman, royal crown, royal saree, jewelry, regal female ruler',
+}
+
+
+class CharacterCatalog:
+    def __init__(self):
+        self._characters = {}  # name -> {'gender', 'patterns', 'description', 'order'}
+        self._pattern_to_name = {}
+        self._regex = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, gender: str, patterns: list, description: str = None):
+        """Add or replace a character - the matcher is rebuilt on next use"""
+        with self._lock:
+            order = self._characters[name]['order'] if name in self._characters else len(self._characters)
+            self._characters[name] = {
+                'gender': gender,
+                'patterns': [self._normalize(p) for p in patterns if p.strip()],
+                'description': description,
+                'order': order,
+            }
+            self._regex = None
+
+    @staticmethod
+    def _normalize(pattern: str) -> str:
+        return " ".join(pattern.lower().split())
+
+    @staticmethod
+    def _trie_regex(patterns) -> str:
+        """
+        Factor the alternation into a prefix trie ('kr(?:ishna|...)') so the
+        regex engine tests each position once instead of once per pattern.
+        Longer continuations are tried first, so 'shri krishna' wins over 'shri'.
+        """
+        trie = {}
+        for pattern in patterns:
+            node = trie
+            for ch in pattern:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def build(node) -> str:
+            end = "" in node
+            branches = []
+            for ch in sorted(k for k in node if k):
+                token = r"\s+" if ch == " " else re.escape(ch)
+                branches.append(token + build(node[ch]))
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            return f"(?:{body})?" if end else body
+
+        return build(trie)
+
+    def _compile(self):
+        """Build one word-boundary-aware alternation regex over every pattern"""
+        with self._lock:
+            if self._regex is not None:
+                return self._regex
+
+            pattern_to_name = {}
+            for name, info in self._characters.items():
+                for pattern in info['patterns']:
+                    pattern_to_name.setdefault(pattern, name)
+
+            if not pattern_to_name:
+                self._pattern_to_name = {}
+                self._regex = re.compile(r"(?!x)x")  # matches nothing
+                return self._regex
+
+            body = self._trie_regex(pattern_to_name)
+            # Optional plural, and word boundaries so 'ram' never matches inside 'program'
+            self._pattern_to_name = pattern_to_name
+            self._regex = re.compile(rf"\b(?:{body})(?:s|es)?\b")
+            return self._regex
+
+    def _name_for(self, matched: str) -> str:
+        key = self._normalize(matched)
+        if key in self._pattern_to_name:
+            return self._pattern_to_name[key]
+        for suffix in ("es", "s"):
+            if key.endswith(suffix) and key[:-len(suffix)] in self._pattern_to_name:
+                return self._pattern_to_name[key[:-len(suffix)]]
+        return None
+
+    def describe(self, name: str, gender: str) -> str:
+        info = self._characters.get(name)
+        if info and info['description']:
+            return info['description']
+        return f'{name}, {gender} character, traditional Indian appearance'
+
+    def find(self, text: str) -> list:
+        """
+        Return detected characters (each once) in catalog order:
+        [{'name', 'gender', 'description'}, ...]
+        """
+        regex = self._compile()
+        found = set()
+        # findall runs entirely in C; only distinct matches are mapped back
+        for matched in set(regex.findall(text.lower())):
+            name = self._name_for(matched)
+            if name:
+                found.add(name)
+
+        ordered = sorted(found, key=lambda n: self._characters[n]['order'])
+        return [
+            {
+                'name': name,
+                'gender': self._characters[name]['gender'],
+                'description': self.describe(name, self._characters[name]['gender'])
+            }
+            for name in ordered
+        ]
+
+
+def build_default_catalog() -> CharacterCatalog:
+    catalog = CharacterCatalog()
+    for name, patterns in MALE_PATTERNS.items():
+        catalog.register(name, 'male', patterns, CHARACTER_DESCRIPTIONS.get(name))
+    for name, patterns in FEMALE_PATTERNS.items():
+        catalog.register(name, 'female', patterns, CHARACTER_DESCRIPTIONS.get(name))
+    catalog._compile()
+    return catalog
+
+
+# Built once at import and shared by every ImageGenerator
+DEFAULT_CATALOG = build_default_catalog()
+
+def register_character(name: str, gender: str, patterns: list, description: str = None):
+    """Extend the shared catalog, e.g. register_character('Shiva', 'male', ['shiva', 'mahadev'], '...')"""
+    DEFAULT_CATALOG.register(name, gender, patterns, description)
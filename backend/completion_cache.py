@@ -0,0 +1,140 @@
+# backend/completion_cache.py
+# SQLite-backed cache for LLM completions - repeated requests skip the API
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_DB_PATH = "assets/cache/completions.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace so trivially different prompts share an entry"""
+    return " ".join((text or "").split())
+
+
+class CompletionCache:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, allow_nonzero_temperature: bool = False):
+        """
+        allow_nonzero_temperature: sampled (temperature > 0) completions are
+            only served from cache when this is on - otherwise every request
+            at nonzero temperature goes to the API as before
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.allow_nonzero_temperature = allow_nonzero_temperature
+
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions(last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        payload = json.dumps([model, _normalize(system), _normalize(prompt),
+                              round(float(temperature), 3), int(max_tokens)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        return temperature == 0 or self.allow_nonzero_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.conn.commit()
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop expired rows, then least recently used rows over max_entries"""
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM completions WHERE created_at < ?",
+                              (time.time() - self.ttl_seconds,))
+        if self.max_entries:
+            count = self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute("""
+                    DELETE FROM completions WHERE key IN (
+                        SELECT key FROM completions ORDER BY last_used ASC LIMIT ?
+                    )
+                """, (count - self.max_entries,))
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_completion_cache() -> CompletionCache:
+    """
+    Process-wide cache. Configure with env vars:
+      STORY_CACHE_TTL_SECONDS, STORY_CACHE_MAX_ENTRIES,
+      STORY_CACHE_ALLOW_NONZERO_TEMPERATURE=1
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CompletionCache(
+                ttl_seconds=float(os.getenv("STORY_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                max_entries=int(os.getenv("STORY_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                allow_nonzero_temperature=os.getenv("STORY_CACHE_ALLOW_NONZERO_TEMPERATURE", "0") == "1",
+            )
+        return _default_cache
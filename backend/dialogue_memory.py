@@ -0,0 +1,95 @@
+# backend/dialogue_memory.py
+# Bounded conversation memory for the mythology dialogue - the last few
+# turns verbatim, older turns folded into a short summary with a token budget
+
+import math
+import re
+from collections import deque
+from typing import List, Tuple
+
+DEFAULT_RECENT_TURNS = 6
+DEFAULT_SUMMARY_TOKENS = 200
+GIST_WORDS = 20
+CHARS_PER_TOKEN = 4  # rough estimate for English text, no tokenizer needed
+
+USER_SPEAKER = "You"
+
+_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)", re.S)
+
+
+def estimate_tokens(text: str) -> int:
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _gist(text: str, max_words: int = GIST_WORDS) -> str:
+    """First sentence, capped at max_words - enough to remember what was said"""
+    text = " ".join(text.split())
+    match = _SENTENCE.match(text)
+    first = match.group(1) if match else text
+    words = first.split()
+    if len(words) > max_words:
+        return " ".join(words[:max_words]) + "…"
+    return first
+
+
+class DialogueMemory:
+    """
+    Turns are (speaker, text) pairs. The newest recent_turns stay verbatim;
+    each older turn is folded into a one-line gist. Gists are dropped oldest
+    first once the summary goes over summary_tokens, so the prompt context
+    stays the same size however long the conversation runs.
+    """
+
+    def __init__(self, recent_turns: int = DEFAULT_RECENT_TURNS,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS):
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.recent = deque()
+        self.summary: List[str] = []
+        self.summary_size = 0
+        self.dropped = 0
+        self.total_turns = 0
+
+    def add(self, speaker: str, text: str):
+        self.recent.append((speaker, text.strip()))
+        self.total_turns += 1
+        while len(self.recent) > self.recent_turns:
+            self._fold(*self.recent.popleft())
+
+    def _fold(self, speaker: str, text: str):
+        line = f"{speaker}: {_gist(text)}"
+        self.summary.append(line)
+        self.summary_size += estimate_tokens(line)
+        while self.summary_size > self.summary_tokens and len(self.summary) > 1:
+            self.summary_size -= estimate_tokens(self.summary.pop(0))
+            self.dropped += 1
+
+    @property
+    def folded_turns(self) -> int:
+        return len(self.summary) + self.dropped
+
+    def recent_turns_list(self) -> List[Tuple[str, str]]:
+        return list(self.recent)
+
+    def render(self) -> str:
+        """Conversation so far, formatted for the prompt"""
+        parts = []
+        if self.summary:
+            lines = []
+            if self.dropped:
+                lines.append(f"({self.dropped} earlier turns omitted)")
+            lines.extend(f"- {line}" for line in self.summary)
+            parts.append("Earlier in the conversation (summary):\n" + "\n".join(lines))
+        if self.recent:
+            parts.append("Recent turns:\n" + "\n".join(f"{speaker}: {text}"
+                                                      for speaker, text in self.recent))
+        return "\n\n".join(parts)
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.total_turns,
+            "verbatim": len(self.recent),
+            "summarized": len(self.summary),
+            "dropped": self.dropped,
+            "context_tokens": estimate_tokens(self.render()),
+        }
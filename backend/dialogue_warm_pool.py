@@ -0,0 +1,143 @@
+# backend/dialogue_warm_pool.py
+# Pre-generated opening turns for the mythology dialogue. The first turn
+# has no user input, so it can be produced before anyone asks for it.
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+DEFAULT_POOL_SIZE = 2             # ready openings kept per scenario
+DEFAULT_MAX_AGE = 30 * 60         # older openings are regenerated
+RETRY_AFTER = 60                  # pause refills for a scenario after a failure
+
+
+class DialogueWarmPool:
+    """
+    generate(scenario=..., priority=...) -> dialogue dict, as
+    generate_mythology_dialogue. Each opening is handed out once, and every
+    take() queues a background refill at low priority.
+    """
+
+    def __init__(self, generate: Callable[..., dict], scenarios: List[dict],
+                 size: int = DEFAULT_POOL_SIZE, max_age: float = DEFAULT_MAX_AGE,
+                 refill_priority: int = None):
+        self.generate = generate
+        self.scenarios = scenarios
+        self.size = size
+        self.max_age = max_age
+        self.refill_priority = refill_priority
+
+        self.ready = {s["epic"]: deque() for s in scenarios}
+        self.pending = {s["epic"]: 0 for s in scenarios}
+        self.failed_at = {s["epic"]: None for s in scenarios}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dialogue-pool")
+
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def _produce(self, scenario: dict):
+        epic = scenario["epic"]
+        try:
+            kwargs = {"scenario": scenario}
+            if self.refill_priority is not None:
+                kwargs["priority"] = self.refill_priority
+            opening = self.generate(**kwargs)
+            with self.lock:
+                if "error" in opening:
+                    self.failures += 1
+                    self.failed_at[epic] = time.monotonic()
+                else:
+                    self.ready[epic].append((time.monotonic(), opening))
+        except Exception as e:
+            print(f"⚠️  Warm pool refill failed ({epic}): {e}")
+            with self.lock:
+                self.failures += 1
+                self.failed_at[epic] = time.monotonic()
+        finally:
+            with self.lock:
+                self.pending[epic] -= 1
+
+    def _refill(self, scenario: dict):
+        """Queue enough background generations to bring this scenario back to size"""
+        epic = scenario["epic"]
+        with self.lock:
+            failed_at = self.failed_at[epic]
+            if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER:
+                return
+            missing = self.size - len(self.ready[epic]) - self.pending[epic]
+            self.pending[epic] += max(0, missing)
+        for _ in range(missing):
+            self.executor.submit(self._produce, scenario)
+
+    def warm(self):
+        """Start filling every scenario - call early, e.g. when the dialogue page opens"""
+        if self.size <= 0:
+            return
+        for scenario in self.scenarios:
+            self._refill(scenario)
+
+    def _pop_fresh(self, epic: str):
+        now = time.monotonic()
+        queue = self.ready[epic]
+        while queue:
+            created, opening = queue.popleft()
+            if now - created <= self.max_age:
+                return opening
+        return None
+
+    def take(self, scenario: dict = None, **generate_kwargs) -> dict:
+        """
+        An opening turn for scenario (random if None, preferring one that's ready).
+        Falls back to generating on the spot; generate_kwargs (e.g. on_segment)
+        only apply to that fallback.
+        """
+        with self.lock:
+            if scenario is None:
+                ready = [s for s in self.scenarios if self.ready[s["epic"]]]
+                scenario = random.choice(ready or self.scenarios)
+            opening = self._pop_fresh(scenario["epic"])
+            if opening is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if self.size > 0:
+            self._refill(scenario)
+        if opening is not None:
+            print(f"⚡ Warm pool hit ({scenario['epic']})")
+            return opening
+        return self.generate(scenario=scenario, **generate_kwargs)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "ready": {epic: len(q) for epic, q in self.ready.items()},
+                "pending": dict(self.pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+            }
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_dialogue_pool() -> DialogueWarmPool:
+    """Process-wide pool. DIALOGUE_POOL_SIZE sets openings per scenario (0 disables)."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            from backend.groq_scheduler import PRIORITY_BATCH
+            from backend.story_generator import MYTHOLOGY_SCENARIOS, generate_mythology_dialogue
+            _default_pool = DialogueWarmPool(
+                generate_mythology_dialogue, MYTHOLOGY_SCENARIOS,
+                size=int(os.getenv("DIALOGUE_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                refill_priority=PRIORITY_BATCH,
+            )
+        return _default_pool
@@ -0,0 +1,205 @@
+# backend/groq_scheduler.py
+# Process-wide scheduler for Groq requests - priority classes, a concurrency
+# cap and requests/tokens-per-minute buckets reconciled with reported usage
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from backend.rate_limiter import TokenBucket
+
+# Lower number = served first
+PRIORITY_INTERACTIVE = 0   # dialogue turns - someone is waiting on every reply
+PRIORITY_STORY = 1         # story pages
+PRIORITY_BATCH = 2         # generate_many and other background work
+
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_STORY: "story", PRIORITY_BATCH: "batch"}
+
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 6000
+CHARS_PER_TOKEN = 4
+WAIT_SAMPLES = 200
+
+
+def estimate_prompt_tokens(*texts: str) -> int:
+    return int(math.ceil(sum(len(t or "") for t in texts) / CHARS_PER_TOKEN))
+
+
+class Lease:
+    """One admitted request - report its usage so the token bucket can be corrected"""
+
+    __slots__ = ("priority", "reserved", "used", "rate_limited")
+
+    def __init__(self, priority: int, reserved: int):
+        self.priority = priority
+        self.reserved = reserved
+        self.used = None
+        self.rate_limited = False
+
+    def record_usage(self, usage):
+        """usage: the completion's usage object (total_tokens), or a plain token count"""
+        if usage is None:
+            return
+        total = getattr(usage, "total_tokens", usage)
+        if total is not None:
+            self.used = int(total)
+
+
+class GroqScheduler:
+    """
+    Requests wait in one priority queue. The head of the queue is admitted
+    when a concurrency slot is free and both minute buckets can cover it;
+    tokens are reserved as prompt estimate + max_tokens and the difference
+    to the reported usage is credited back when the request finishes.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE):
+        """requests_per_minute / tokens_per_minute <= 0 disables that limit"""
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, max(1.0, tokens_per_minute))
+
+        self.cond = threading.Condition()
+        self.queue = []
+        self.seq = itertools.count()
+        self.active = 0
+
+        self.completed = 0
+        self.rate_limited = 0
+        self.tokens_used = 0
+        self.peak_queue = 0
+        self.waits = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITY_NAMES}
+
+    def _reserve(self, tokens: int) -> float:
+        """Take one request and the tokens if both are available; else seconds to wait"""
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+        self.requests.try_acquire(1)
+        self.tokens.try_acquire(tokens)
+        return 0.0
+
+    def acquire(self, priority: int, estimated_tokens: int) -> Lease:
+        """Block until this request may be sent"""
+        reserved = int(min(max(1, estimated_tokens), self.tokens.capacity))
+        ticket = (priority, next(self.seq))
+        start = time.monotonic()
+
+        with self.cond:
+            heapq.heappush(self.queue, ticket)
+            self.peak_queue = max(self.peak_queue, len(self.queue))
+            while True:
+                if self.queue[0] == ticket and self.active < self.max_concurrent:
+                    wait = self._reserve(reserved)
+                    if wait == 0:
+                        break
+                    self.cond.wait(wait)
+                else:
+                    self.cond.wait()
+            heapq.heappop(self.queue)
+            self.active += 1
+            self.waits.setdefault(priority, deque(maxlen=WAIT_SAMPLES)).append(time.monotonic() - start)
+            self.cond.notify_all()
+
+        return Lease(priority, reserved)
+
+    def release(self, lease: Lease):
+        if lease.used is not None:
+            self.tokens.credit(lease.reserved - lease.used)
+        if lease.rate_limited:
+            self.tokens.drain()
+            self.requests.drain()
+
+        with self.cond:
+            self.active -= 1
+            self.completed += 1
+            self.tokens_used += lease.used if lease.used is not None else lease.reserved
+            self.rate_limited += lease.rate_limited
+            self.cond.notify_all()
+
+    @staticmethod
+    def _note_error(lease: Lease, error: Exception):
+        if getattr(error, "status_code", None) == 429:
+            print("⏳ Groq rate limit hit - pausing the scheduler's buckets")
+            lease.rate_limited = True
+
+    @contextmanager
+    def slot(self, priority: int, estimated_tokens: int):
+        """with scheduler.slot(PRIORITY_STORY, n) as lease: ... lease.record_usage(usage)"""
+        lease = self.acquire(priority, estimated_tokens)
+        try:
+            yield lease
+        except Exception as e:
+            self._note_error(lease, e)
+            raise
+        finally:
+            self.release(lease)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int, estimated_tokens: int):
+        """Async slot - the wait happens in a worker thread so the event loop keeps running"""
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self.acquire, priority, estimated_tokens))
+        try:
+            lease = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The request is still admitted later - hand the slot straight back
+            acquiring.add_done_callback(lambda f: f.exception() is None and self.release(f.result()))
+            raise
+
+        try:
+            yield lease
+        except Exception as e:
+            self._note_error(lease, e)
+            raise
+        finally:
+            self.release(lease)
+
+    def stats(self) -> dict:
+        with self.cond:
+            waits = {}
+            for priority, samples in self.waits.items():
+                ordered = sorted(samples)
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waits[name] = {
+                    "count": len(ordered),
+                    "avg_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+                    "p95_ms": 1000 * ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0,
+                    "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+                }
+            return {
+                "queue_depth": len(self.queue),
+                "peak_queue_depth": self.peak_queue,
+                "active": self.active,
+                "completed": self.completed,
+                "rate_limited": self.rate_limited,
+                "tokens_used": self.tokens_used,
+                "wait": waits,
+            }
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+def get_groq_scheduler() -> GroqScheduler:
+    """
+    Process-wide scheduler, shared by every session. Configure with env vars:
+      GROQ_MAX_CONCURRENT, GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = GroqScheduler(
+                max_concurrent=int(os.getenv("GROQ_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT)),
+                requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+                tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)),
+            )
+        return _default_scheduler
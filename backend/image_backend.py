@@ -0,0 +1,111 @@
+# backend/image_backend.py
+# Pluggable image backends - pooled keep-alive HTTP session, configurable endpoint
+
+import os
+import threading
+from urllib.parse import quote
+
+POLLINATIONS_URL = "https://image.pollinations.ai"
+
+# Override with env vars, e.g. IMAGE_BACKEND_URL=http://127.0.0.1:8765 for the local stand-in.
+# They are read when the backend is built, so values loaded from .env apply.
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 90.0
+DEFAULT_POOL_SIZE = 16
+MIN_IMAGE_BYTES = 15000
+
+
+class ImageBackendError(Exception):
+    """Backend answered, but not with a usable image"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        """Server errors, rate limits and bad payloads are worth retrying; other 4xx are not"""
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+class ImageBackend:
+    """Interface for anything that turns a prompt into image bytes"""
+
+    # Added to cache keys so images from different backends never mix
+    cache_namespace = ""
+
+    def fetch(self, prompt: str, seed: int, width: int, height: int, model: str,
+              timeout: float = None) -> bytes:
+        """timeout: per-attempt read timeout override in seconds"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HTTPImageBackend(ImageBackend):
+    """
+    Pollinations-style GET {base_url}/prompt/{prompt}?width=&height=&seed=&model=
+    One requests.Session per backend, so TCP/TLS connections are reused.
+    """
+
+    def __init__(self, base_url: str = None,
+                 connect_timeout: float = None,
+                 read_timeout: float = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 min_bytes: int = MIN_IMAGE_BYTES):
+        """Unset arguments come from IMAGE_BACKEND_URL / _CONNECT_TIMEOUT / _TIMEOUT"""
+        if base_url is None:
+            base_url = os.getenv("IMAGE_BACKEND_URL", POLLINATIONS_URL)
+        if connect_timeout is None:
+            connect_timeout = float(os.getenv("IMAGE_BACKEND_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+        if read_timeout is None:
+            read_timeout = float(os.getenv("IMAGE_BACKEND_TIMEOUT", DEFAULT_READ_TIMEOUT))
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.min_bytes = min_bytes
+        self.cache_namespace = "" if self.base_url == POLLINATIONS_URL else self.base_url
+
+        # Imported here rather than at module level to keep app start-up fast
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def build_url(self, prompt: str, seed: int, width: int, height: int, model: str) -> str:
+        return (f"{self.base_url}/prompt/{quote(prompt)}"
+                f"?width={width}&height={height}&seed={seed}&nologo=true&model={model}")
+
+    def fetch(self, prompt: str, seed: int, width: int, height: int, model: str,
+              timeout: float = None) -> bytes:
+        url = self.build_url(prompt, seed, width, height, model)
+        connect_timeout, read_timeout = self.timeout
+        if timeout is not None:
+            read_timeout = min(read_timeout, timeout)
+        response = self.session.get(url, timeout=(connect_timeout, read_timeout))
+
+        if response.status_code != 200:
+            raise ImageBackendError(f"Status {response.status_code}", response.status_code)
+
+        if len(response.content) <= self.min_bytes:
+            raise ImageBackendError("Too small")
+
+        return response.content
+
+    def close(self):
+        self.session.close()
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+def get_image_backend() -> ImageBackend:
+    """Process-wide backend - every generator shares one connection pool"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = HTTPImageBackend()
+        return _default_backend
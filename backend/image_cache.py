@@ -0,0 +1,148 @@
+# backend/image_cache.py
+# Content-addressed on-disk cache for generated images with LRU eviction
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_DIR = "assets/cache/images"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+class ImageCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.lock = threading.Lock()
+        self._index = None  # key -> [size, last_used], loaded lazily
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(prompt: str, seed: int, width: int, height: int, model: str,
+                 namespace: str = "") -> str:
+        """Hash of everything that determines the backend's output"""
+        fields = [prompt, seed, width, height, model]
+        if namespace:
+            fields.append(namespace)  # non-default backends never share entries
+        payload = json.dumps(fields, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.img"
+
+    def _load_index(self):
+        """Scan the cache directory once - file mtime is the LRU timestamp"""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        for path in self.cache_dir.glob("*/*.img"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            self._index[path.stem] = [stat.st_size, stat.st_mtime]
+            self._total_bytes += stat.st_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes or None. A hit refreshes the entry's LRU position."""
+        path = self._path(key)
+        with self.lock:
+            self._load_index()
+            try:
+                data = path.read_bytes()
+            except OSError:
+                self.misses += 1
+                self._forget(key)
+                return None
+
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+            if key in self._index:
+                self._index[key][1] = now
+            else:
+                self._index[key] = [len(data), now]
+                self._total_bytes += len(data)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        """Store bytes atomically, then evict least recently used entries over budget"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self.lock:
+            self._load_index()
+            self._forget(key)
+            self._index[key] = [len(data), time.time()]
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _forget(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._total_bytes -= entry[0]
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            self._forget(key)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Hit / miss counters and current size"""
+        with self.lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_image_cache() -> ImageCache:
+    """Process-wide cache shared by every ImageGenerator"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ImageCache()
+        return _default_cache
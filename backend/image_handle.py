@@ -0,0 +1,87 @@
+# backend/image_handle.py
+# Compact handle for a generated image - raw bytes and/or a file path.
+# Base64 is produced only at the boundary that actually needs it.
+
+import base64
+import io
+from pathlib import Path
+from typing import Optional
+
+# Longest side of the grid renditions sent to the browser
+THUMBNAIL_SIZE = 480
+
+
+class ImageHandle:
+    __slots__ = ("data", "path", "scene_num", "_size", "_thumb")
+
+    def __init__(self, data: Optional[bytes] = None, path: Optional[str] = None,
+                 scene_num: Optional[int] = None):
+        if data is None and path is None:
+            raise ValueError("ImageHandle needs bytes or a path")
+        self.data = data
+        self.path = str(path) if path is not None else None
+        self.scene_num = scene_num
+        self._size = None
+        self._thumb = None
+
+    @classmethod
+    def coerce(cls, image) -> Optional["ImageHandle"]:
+        """Accept a handle, raw bytes, a file path or a legacy base64 string"""
+        if image is None or isinstance(image, cls):
+            return image
+        if isinstance(image, (bytes, bytearray)):
+            return cls(data=bytes(image))
+        if isinstance(image, Path):
+            return cls(path=str(image))
+        if isinstance(image, str):
+            if len(image) < 1024 and Path(image).is_file():
+                return cls(path=image)
+            return cls(data=base64.b64decode(image))
+        raise TypeError(f"Unsupported image type: {type(image).__name__}")
+
+    def read_bytes(self) -> bytes:
+        """Raw encoded image bytes (PNG/JPEG) - no copy when held in memory"""
+        if self.data is not None:
+            return self.data
+        return Path(self.path).read_bytes()
+
+    @property
+    def nbytes(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return Path(self.path).stat().st_size
+
+    @property
+    def size(self) -> tuple:
+        """(width, height) - read from the image header once, then cached"""
+        if self._size is None:
+            from PIL import Image
+            source = io.BytesIO(self.data) if self.data is not None else self.path
+            with Image.open(source) as img:
+                self._size = img.size
+        return self._size
+
+    def thumbnail(self, max_side: int = THUMBNAIL_SIZE) -> bytes:
+        """Small JPEG rendition for previews - built once, then cached"""
+        if self._thumb is not None and self._thumb[0] == max_side:
+            return self._thumb[1]
+        from PIL import Image
+        with Image.open(io.BytesIO(self.read_bytes())) as img:
+            self._size = img.size
+            img.draft("RGB", (max_side, max_side))  # JPEG: decode at reduced scale
+            img = img.convert("RGB")
+            img.thumbnail((max_side, max_side))
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=82, optimize=True)
+        self._thumb = (max_side, out.getvalue())
+        return self._thumb[1]
+
+    def to_b64(self) -> str:
+        return base64.b64encode(self.read_bytes()).decode("utf-8")
+
+    def data_uri(self, mime: str = "image/png") -> str:
+        return f"data:{mime};base64,{self.to_b64()}"
+
+    def __repr__(self):
+        where = self.path if self.path else f"{len(self.data)} bytes"
+        return f"ImageHandle(scene={self.scene_num}, {where})"
@@ -2,18 +2,167 @@
 # ULTRA DETAILED - Extracts exact characters, genders, and details from prompt and story
 
 import os
-import requests
-import base64
-from pathlib import Path
 import time
 import random
 import re
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class ImageGenerator:
+from backend.rate_limiter import TokenBucket, get_rate_limiter
+from backend.image_cache import ImageCache, get_image_cache
+from backend.artifact_store import ArtifactStore, get_artifact_store
+from backend.character_matcher import CharacterCatalog, DEFAULT_CATALOG
+from backend.image_handle import ImageHandle, THUMBNAIL_SIZE
+from backend.image_backend import ImageBackend, ImageBackendError, get_image_backend
+from backend.resilience import RetryPolicy, get_circuit_breaker, hedged_call
+
+# Backend limits - requests per second and burst size.
+# These replace the old fixed 7 second sleeps between images.
+DEFAULT_REQUESTS_PER_SECOND = 0.5
+DEFAULT_BURST = 3
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Tail latency controls - every scene gets per-request retries with
+# jittered backoff, an optional hedged duplicate for slow requests, and
+# a hard deadline so one stuck request can't hold a slot for minutes
+DEFAULT_HEDGE_AFTER = 40.0
+DEFAULT_SCENE_TIMEOUT = 120.0
+
+# Image request parameters - all of these are part of the cache key.
+# Callers that know the output size (e.g. the 1280x720 video) should
+# request it directly instead of letterboxing a square image later.
+IMAGE_WIDTH = 1024
+IMAGE_HEIGHT = 1024
+IMAGE_MODEL = "flux"
+
+class SingleFlight:
+    """
+    Request coalescing - concurrent calls with the same key share one
+    execution and all receive its result (or its exception).
+    """
+    
+    class _Call:
+        __slots__ = ("done", "result", "error")
+        
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
     def __init__(self):
-        self.images_dir = Path("assets/images/generated")
-        self.images_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.executions = 0
+        self.shared = 0
+    
+    def do(self, key: str, fn) -> tuple:
+        """Returns (result, shared) - shared is True if another caller did the work"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._Call()
+                self.calls[key] = call
+                self.executions += 1
+            else:
+                self.shared += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+    
+    def stats(self) -> dict:
+        with self.lock:
+            return {"executions": self.executions, "shared": self.shared, "in_flight": len(self.calls)}
+
+
+# One per process - identical prompts from different sessions share a fetch
+_inflight_images = SingleFlight()
+
+def get_inflight_stats() -> dict:
+    return _inflight_images.stats()
+
+
+class ImageGenerator:
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 requests_per_second: float = None,
+                 burst: int = None,
+                 cache: ImageCache = None,
+                 deterministic_seeds: bool = False,
+                 session: str = "default",
+                 job_id: str = None,
+                 store: ArtifactStore = None,
+                 catalog: CharacterCatalog = None,
+                 backend: ImageBackend = None,
+                 retry_policy: RetryPolicy = None,
+                 hedge_after: float = DEFAULT_HEDGE_AFTER,
+                 scene_timeout: float = DEFAULT_SCENE_TIMEOUT,
+                 width: int = IMAGE_WIDTH,
+                 height: int = IMAGE_HEIGHT,
+                 thumbnail_size: int = THUMBNAIL_SIZE):
+        """
+        requests_per_second / burst: backend rate limit. By default every
+            generator shares one process-wide limiter per backend; passing
+            either gives this generator its own (tests, benchmarks)
+        cache: on-disk image cache (defaults to the shared process-wide cache)
+        deterministic_seeds: derive seeds from the prompt instead of a random
+            session id, so repeated topics hit the cache
+        session / job_id: artifact namespace, so concurrent users never
+            overwrite each other's scene files
+        catalog: character catalog (defaults to the shared compiled catalog)
+        backend: where images come from (defaults to the shared pooled HTTP backend)
+        retry_policy / hedge_after / scene_timeout: per-scene retry, hedging
+            (None disables) and total deadline in seconds
+        width / height: size requested from the backend
+        thumbnail_size: build preview renditions in the fetch threads (None disables)
+        """
+        self.store = store if store is not None else get_artifact_store()
+        self.session = session
+        self.job_id = job_id or f"job_{int(time.time())}_{random.randint(0, 9999):04d}"
+        self.images_dir = self.store.job_dir("images", self.session, self.job_id)
         self.session_id = int(time.time()) + random.randint(0, 9999)
+        
+        self.max_in_flight = max(1, max_in_flight)
+        
+        self.cache = cache if cache is not None else get_image_cache()
+        self.deterministic_seeds = deterministic_seeds
+        self.width = width
+        self.height = height
+        self.model = IMAGE_MODEL
+        self.thumbnail_size = thumbnail_size
+        
+        self.catalog = catalog if catalog is not None else DEFAULT_CATALOG
+        self.backend = backend if backend is not None else get_image_backend()
+        backend_name = f"images:{self.backend.cache_namespace or 'default'}"
+        
+        if requests_per_second is None and burst is None:
+            # Shared by every session, so N users together stay within the backend's limits
+            self.limiter = get_rate_limiter(backend_name, DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST)
+        else:
+            self.limiter = TokenBucket(
+                DEFAULT_REQUESTS_PER_SECOND if requests_per_second is None else requests_per_second,
+                DEFAULT_BURST if burst is None else burst,
+            )
+        
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_after = hedge_after
+        self.scene_timeout = scene_timeout
+        # Shared by every session using this backend, so an outage is detected once
+        self.breaker = get_circuit_breaker(backend_name)
     
     def extract_characters_and_details(self, user_prompt: str, story_text: str) -> dict:
         """
@@ -21,72 +170,8 @@ class ImageGenerator:
         """
         combined_text = (user_prompt + " " + story_text).lower()
         
-        characters = []
-        
-        # Male characters - SPECIFIC names and descriptions
-        male_patterns = {
-            'Krishna': ['krishna', 'shri krishna', 'shree krishna', 'lord krishna'],
-            'Arjun': ['arjun', 'arjuna', 'arjuna warrior'],
-            'Ram': ['ram', 'rama', 'lord ram', 'shri ram'],
-            'Lakshman': ['lakshman', 'laxman', 'lakshmana'],
-            'Hanuman': ['hanuman', 'pawan putra'],
-            'Ravan': ['ravan', 'ravana', 'demon king'],
-            'Bheem': ['bheem', 'bheema', 'bhima'],
-            'Yudhishthir': ['yudhishthir', 'yudhishthira'],
-            'Karna': ['karna'],
-            'father': ['father', 'dad', 'papa', 'pita'],
-            'grandfather': ['grandfather', 'dada', 'nana', 'grandpa'],
-            'brother': ['brother', 'bhai'],
-            'son': ['son', 'beta', 'boy child'],
-            'boy': ['boy', 'young boy', 'male child'],
-            'friend_male': ['two boys', 'boy friends', 'male friends'],
-            'king': ['king', 'raja', 'emperor'],
-        }
-        
-        # Female characters - SPECIFIC names and descriptions
-        female_patterns = {
-            'Sita': ['sita', 'sita devi', 'mata sita'],
-            'Draupadi': ['draupadi', 'panchali'],
-            'Radha': ['radha', 'radha rani'],
-            'Kunti': ['kunti', 'kunti devi'],
-            'mother': ['mother', 'mom', 'maa', 'mata'],
-            'grandmother': ['grandmother', 'dadi', 'nani', 'grandma'],
-            'sister': ['sister', 'bahen', 'didi'],
-            'daughter': ['daughter', 'beti', 'girl child'],
-            'girl': ['girl', 'young girl', 'female child'],
-            'friend_female': ['two girls', 'girl friends', 'female friends'],
-            'queen': ['queen', 'rani'],
-        }
-        
-        # Detect male characters
-        for name, patterns in male_patterns.items():
-            for pattern in patterns:
-                if pattern in combined_text:
-                    characters.append({
-                        'name': name,
-                        'gender': 'male',
-                        'description': self.get_character_description(name, 'male')
-                    })
-                    break
-        
-        # Detect female characters
-        for name, patterns in female_patterns.items():
-            for pattern in patterns:
-                if pattern in combined_text:
-                    characters.append({
-                        'name': name,
-                        'gender': 'female',
-                        'description': self.get_character_description(name, 'female')
-                    })
-                    break
-        
-        # Remove duplicates
-        seen_names = set()
-        unique_chars = []
-        for char in characters:
-            if char['name'] not in seen_names:
-                seen_names.add(char['name'])
-                unique_chars.append(char)
+        # Single compiled pass over the text, word-boundary aware
+        unique_chars = self.catalog.find(combined_text)
         
         return {
             'characters': unique_chars,
@@ -99,43 +184,7 @@ class ImageGenerator:
         Get VERY SPECIFIC visual description for each character
         MUST look exactly like the real/mythological figure
         """
-        descriptions = {
-            # Male mythology characters - EXACT iconic appearance
-            'Krishna': 'Lord Krishna with BLUE SKIN COLOR, peacock feather in crown on head, yellow silk dhoti, holding bamboo flute, divine radiant smile, male god with dark blue complexion, traditional Indian deity appearance',
-            'Arjun': 'Arjuna the warrior prince, strong athletic male warrior, silver armor and warrior clothes, holding large bow with arrows on back, headband, brave determined face, male Pandava hero',
-            'Ram': 'Lord Rama with BLUE SKIN COLOR, bow and quiver of arrows, golden crown, royal yellow dhoti, calm noble face, male prince deity with dark blue complexion',
-            'Lakshman': 'Lakshmana, loyal brother warrior, male with armor, holding bow, traditional warrior dress, devoted expression, strong male companion',
-            'Hanuman': 'Hanuman the monkey god, RED-ORANGE BODY, muscular monkey face and tail, male monkey deity with devotional pose, powerful build',
-            'Ravan': 'Ravana demon king with TEN HEADS stacked vertically, golden crown on each head, fierce demonic face, male demon with dark complexion, multiple arms',
-            'Bheem': 'Bheema the strongest Pandava, VERY MUSCULAR male warrior, holding large mace weapon, massive build, powerful physique, warrior clothes',
-            'Karna': 'Karna the tragic hero, male archer warrior, GOLDEN KAVACH ARMOR covering chest, earrings, bow and arrows, noble warrior appearance',
-            
-            # Male family members
-            'father': 'Indian father, adult male, traditional kurta pajama, caring expression, male parent',
-            'grandfather': 'Indian grandfather, elderly male, white beard, traditional dhoti or kurta, wise old man',
-            'brother': 'young Indian boy, brother, traditional clothes, male sibling',
-            'son': 'young Indian boy child, son, traditional clothes for boys, male child',
-            'boy': 'young Indian boy, male child, simple traditional clothes, playful boy',
-            'friend_male': 'two young Indian boys, male friends, traditional boys clothes, playing together',
-            'king': 'Indian king, adult male, royal crown, royal robes, regal male ruler',
-            
-            # Female mythology characters - EXACT iconic appearance
-            'Sita': 'Sita Devi, beautiful Indian goddess, elegant RED AND GOLD SAREE, flower jewelry in hair, gentle serene face, divine female appearance, traditional goddess look',
-            'Draupadi': 'Draupadi the fire-born queen, beautiful strong Indian woman, DARK LONG HAIR, royal colorful saree, gold jewelry, fierce intelligent eyes, female Panchal princess',
-            'Radha': 'Radha Rani, beautiful devoted goddess, BLUE OR PINK SAREE, flower garlands, loving expression toward Krishna, elegant female deity',
-            'Kunti': 'Kunti Devi the queen mother, mature graceful Indian woman, royal saree, motherly wise face, traditional jewelry, elderly female queen',
-            
-            # Female family members
-            'mother': 'Indian mother, adult woman, beautiful saree, caring expression, female parent, maternal look',
-            'grandmother': 'Indian grandmother, elderly woman, white hair, traditional saree, wise old woman',
-            'sister': 'young Indian girl, sister, traditional dress or salwar, female sibling',
-            'daughter': 'young Indian girl child, daughter, traditional girls dress, female child',
-            'girl': 'young Indian girl, female child, traditional dress, playful girl',
-            'friend_female': 'two young Indian girls, female friends, traditional girls clothes, playing together',
-            'queen': 'Indian queen, adult woman, royal crown, royal saree, jewelry, regal female ruler',
-        }
-        
-        return descriptions.get(name, f'{name}, {gender} character, traditional Indian appearance')
+        return self.catalog.describe(name, gender)
     
     def create_ultra_detailed_prompts(self, user_prompt: str, story_text: str, num_images: int) -> list:
         """
@@ -207,59 +256,139 @@ class ImageGenerator:
         
         return prompts[:num_images]
     
-    def generate_single_image(self, prompt: str, scene_num: int) -> str:
-        """Generate one image with detailed prompt"""
-        
-        print(f"  🎨 Image {scene_num}...", end=" ")
+    def image_seed(self, prompt: str, scene_num: int) -> int:
+        """Random per session by default, or derived from the prompt when deterministic"""
+        if self.deterministic_seeds:
+            digest = hashlib.sha256(f"{scene_num}:{prompt}".encode("utf-8")).hexdigest()
+            return int(digest[:12], 16) % 999999
+        return (self.session_id + scene_num * 12345) % 999999
+    
+    def download_image(self, prompt: str, seed: int, scene_num: int) -> bytes:
+        """
+        Fetch raw image bytes from the backend, None on failure.
+        Retries with jittered exponential backoff inside a per-scene deadline.
+        """
+        deadline = time.monotonic() + self.scene_timeout
+        error = "Timed out"
         
-        try:
-            from urllib.parse import quote
+        for attempt in range(self.retry_policy.max_attempts):
+            if not self.breaker.allow():
+                print(f"  🎨 Image {scene_num}... ❌ Backend unavailable (circuit open)")
+                return None
             
-            # Encode the full detailed prompt
-            encoded_prompt = quote(prompt)
+            remaining = deadline - time.monotonic()
+            # Only real network calls count against the rate limit
+            if remaining <= 0 or not self.limiter.acquire(timeout=remaining):
+                # No request went out - hand a half-open trial slot back
+                self.breaker.record_neutral()
+                break
             
-            # Create seed for variety
-            seed = (self.session_id + scene_num * 12345) % 999999
+            def fetch():
+                return self.backend.fetch(prompt, seed, self.width, self.height, self.model,
+                                          timeout=max(1.0, deadline - time.monotonic()))
+            
+            try:
+                # Hedge only if the rate limiter has a spare token right now
+                content = hedged_call(fetch, self.hedge_after, can_hedge=self.limiter.try_acquire)
+                self.breaker.record_success()
+                return content
+            except ImageBackendError as e:
+                error = str(e)
+                if not e.retryable:
+                    # A rejected prompt is not a backend outage
+                    self.breaker.record_neutral()
+                    print(f"  🎨 Image {scene_num}... ❌ {error}")
+                    return None
+                self.breaker.record_failure()
+            except Exception as e:
+                self.breaker.record_failure()
+                error = type(e).__name__
             
-            # Pollinations AI URL
-            url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1024&height=1024&seed={seed}&nologo=true&model=flux"
+            if attempt < self.retry_policy.max_attempts - 1:
+                delay = min(self.retry_policy.backoff(attempt), max(0.0, deadline - time.monotonic()))
+                print(f"  🎨 Image {scene_num}... ⚠️  {error}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+        
+        print(f"  🎨 Image {scene_num}... ❌ {error}")
+        return None
+    
+    def generate_single_image(self, prompt: str, scene_num: int) -> ImageHandle:
+        """Generate one image with detailed prompt"""
+        
+        try:
+            seed = self.image_seed(prompt, scene_num)
+            key = ImageCache.make_key(prompt, seed, self.width, self.height, self.model,
+                                      self.backend.cache_namespace)
             
-            # Make request
-            response = requests.get(url, timeout=90)
+            content = self.cache.get(key)
+            cached = content is not None
+            shared = False
             
-            if response.status_code == 200:
-                content_length = len(response.content)
+            if not cached:
+                def fetch_and_store():
+                    data = self.download_image(prompt, seed, scene_num)
+                    if data is not None:
+                        self.cache.put(key, data)
+                    return data
                 
-                if content_length > 15000:
-                    # Save to file
-                    filename = f"scene_{scene_num:02d}.png"
-                    filepath = self.images_dir / filename
-                    
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    
-                    # Convert to base64
-                    img_b64 = base64.b64encode(response.content).decode('utf-8')
-                    
-                    size_kb = content_length / 1024
-                    print(f"✅ ({size_kb:.0f} KB)")
-                    
-                    return img_b64
-                else:
-                    print(f"❌ Too small")
+                # Concurrent requests for the same cache key share one outbound fetch
+                content, shared = _inflight_images.do(key, fetch_and_store)
+                if content is None:
                     return None
-            else:
-                print(f"❌ Status {response.status_code}")
-                return None
+            
+            # Save to this job's namespace (atomic write)
+            filename = f"scene_{scene_num:02d}.png"
+            path = self.store.write_bytes("images", self.session, self.job_id, filename, content)
+            
+            size_kb = len(content) / 1024
+            source = "⚡ cached" if cached else ("🔗 shared" if shared else f"{size_kb:.0f} KB")
+            print(f"  🎨 Image {scene_num}... ✅ ({source})")
+            
+            # Raw bytes + path; base64 is only made where a consumer needs it
+            handle = ImageHandle(data=content, path=str(path), scene_num=scene_num)
+            
+            if self.thumbnail_size:
+                try:
+                    handle.thumbnail(self.thumbnail_size)  # off the UI thread
+                except Exception:
+                    pass  # the grid falls back to the full image
+            
+            return handle
                 
         except Exception as e:
-            print(f"❌ Error")
+            print(f"  🎨 Image {scene_num}... ❌ Error")
             return None
     
-    def generate_images_from_story(self, story_text: str, num_images: int = 6, 
-                                   user_prompt: str = "") -> list:
+    def iter_fetch(self, prompts: list, indices: list, concurrent: bool = True):
         """
-        Generate images with EXACT character details
+        Fetch images for the given scene indices, yielding (index, ImageHandle_or_None)
+        in completion order. Callers place results by index, so scene order
+        never depends on which request finished first.
+        """
+        if not concurrent or self.max_in_flight == 1 or len(indices) <= 1:
+            for i in indices:
+                yield i, self.generate_single_image(prompts[i], i + 1)
+            return
+        
+        workers = min(self.max_in_flight, len(indices))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(self.generate_single_image, prompts[i], i + 1): i for i in indices}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Consumer stopped early - don't start scenes nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def fetch_images(self, prompts: list, indices: list, concurrent: bool = True) -> dict:
+        """Fetch images for the given scene indices. Returns {index: ImageHandle_or_None}"""
+        return dict(self.iter_fetch(prompts, indices, concurrent))
+    
+    def iter_images_from_story(self, story_text: str, num_images: int = 6,
+                               user_prompt: str = "", concurrent: bool = True):
+        """
+        Streaming variant - yields (scene_index, ImageHandle) as soon as each
+        image arrives. Failed scenes are never yielded.
         """
         
         print(f"\n{'='*70}")
@@ -277,57 +406,60 @@ class ImageGenerator:
         prompts = self.create_ultra_detailed_prompts(user_prompt, story_text, num_images)
         
         # Generate images
-        print(f"\n🎨 Generating {num_images} images with detailed character descriptions...")
+        mode = f"{self.max_in_flight} in flight" if concurrent else "serial"
+        print(f"\n🎨 Generating {num_images} images with detailed character descriptions ({mode})...")
         print(f"{'='*70}\n")
         
-        images = []
-        
-        for i in range(num_images):
-            img = self.generate_single_image(prompts[i], i + 1)
-            images.append(img)
-            
-            if i < num_images - 1:
-                print(f"  ⏳ Waiting 7 seconds...\n")
-                time.sleep(7)
-        
-        # Count success
-        successful = sum(1 for img in images if img is not None)
-        failed_count = num_images - successful
-        
-        print(f"\n{'='*70}")
-        print(f"📊 RESULTS:")
-        print(f"   ✅ Successful: {successful}/{num_images}")
-        if failed_count > 0:
-            print(f"   ❌ Failed: {failed_count}/{num_images}")
-        print(f"{'='*70}")
+        images = [None] * num_images
         
-        # Retry failed once
-        failed_indices = [i for i, img in enumerate(images) if img is None]
-        
-        if failed_indices and successful > 0:
-            print(f"\n♻️  Retrying {len(failed_indices)} failed...\n")
-            
-            for idx in failed_indices:
-                img = self.generate_single_image(prompts[idx], idx + 1)
-                if img:
-                    images[idx] = img
-                time.sleep(7)
+        for idx, img in self.iter_fetch(prompts, list(range(num_images)), concurrent):
+            images[idx] = img
+            if img is not None:
+                yield idx, img
         
+        # Retries now happen per request (see download_image), so there is
+        # no second pass over failed scenes after the batch
         final = sum(1 for img in images if img is not None)
+        cache_stats = self.cache.stats()
         
         print(f"\n{'='*70}")
         print(f"✅ FINAL: {final}/{num_images} images")
+        if final < num_images:
+            print(f"   ❌ Failed: {num_images - final}/{num_images}")
+        print(f"   Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
         print(f"{'='*70}\n")
+    
+    def generate_images_from_story(self, story_text: str, num_images: int = 6, 
+                                   user_prompt: str = "", concurrent: bool = True,
+                                   on_image=None) -> list:
+        """
+        Generate images with EXACT character details
+        concurrent=True fetches up to max_in_flight scenes at once
+        on_image(scene_index, ImageHandle) is called as each image arrives
+        """
+        images = [None] * num_images
+        
+        for idx, img in self.iter_images_from_story(story_text, num_images, user_prompt, concurrent):
+            images[idx] = img
+            if on_image:
+                on_image(idx, img)
         
         return images
 
 
 def generate_images_from_story(story_text: str, num_images: int = 6, 
-                               user_prompt: str = "") -> list:
+                               user_prompt: str = "", concurrent: bool = True,
+                               deterministic_seeds: bool = False,
+                               session: str = "default", job_id: str = None,
+                               on_image=None, width: int = IMAGE_WIDTH,
+                               height: int = IMAGE_HEIGHT) -> list:
     """Generate images with exact character details"""
     try:
-        generator = ImageGenerator()
-        return generator.generate_images_from_story(story_text, num_images, user_prompt)
+        generator = ImageGenerator(deterministic_seeds=deterministic_seeds,
+                                   session=session, job_id=job_id,
+                                   width=width, height=height)
+        return generator.generate_images_from_story(story_text, num_images, user_prompt,
+                                                    concurrent, on_image)
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}")
         import traceback
@@ -0,0 +1,94 @@
+# backend/ken_burns.py
+# Zoom/pan engine - the whole segment's affine schedule is computed up front
+# with NumPy, and each frame is one OpenCV call into a reused buffer
+
+import cv2
+import numpy as np
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) ** 2,
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+# Where the crop window sits inside the zoom slack at the start and end of
+# the segment: (x, y) with 0 = left/top edge, 1 = right/bottom edge
+PANS = {
+    "drift_in": ((0.0, 0.0), (0.5, 0.5)),   # the original look: top-left towards centre
+    "center": ((0.5, 0.5), (0.5, 0.5)),
+    "left": ((1.0, 0.5), (0.0, 0.5)),
+    "right": ((0.0, 0.5), (1.0, 0.5)),
+    "up": ((0.5, 1.0), (0.5, 0.0)),
+    "down": ((0.5, 0.0), (0.5, 1.0)),
+}
+
+DEFAULT_PAN = "drift_in"
+DEFAULT_ZOOM = (1.0, 1.08)
+
+
+class KenBurns:
+    def __init__(self, zoom: tuple = DEFAULT_ZOOM, pan: str = DEFAULT_PAN,
+                 easing: str = "linear", subpixel: bool = False,
+                 interpolation: int = cv2.INTER_LINEAR):
+        """
+        zoom: (start, end) magnification, e.g. (1.08, 1.0) zooms out
+        pan: key of PANS; easing: key of EASINGS
+        subpixel: render with cv2.warpAffine so very slow pans don't step a
+            pixel at a time - about 3x slower than the default crop + resize
+        """
+        if pan not in PANS:
+            raise ValueError(f"Unknown pan {pan!r}, expected one of {sorted(PANS)}")
+        if easing not in EASINGS:
+            raise ValueError(f"Unknown easing {easing!r}, expected one of {sorted(EASINGS)}")
+        self.zoom = zoom
+        self.pan = pan
+        self.easing = easing
+        self.subpixel = subpixel
+        self.interpolation = interpolation
+
+    def schedule(self, frames: int, width: int, height: int) -> np.ndarray:
+        """(frames, 2, 3) affine matrices mapping source pixels to output pixels"""
+        t = EASINGS[self.easing](np.arange(frames, dtype=np.float64) / max(1, frames))
+        z0, z1 = self.zoom
+        zoom = z0 + (z1 - z0) * t
+
+        (ax0, ay0), (ax1, ay1) = PANS[self.pan]
+        ax = ax0 + (ax1 - ax0) * t
+        ay = ay0 + (ay1 - ay0) * t
+
+        # Crop origin = anchor * slack, where slack is what the zoom leaves over
+        ox = ax * (width - width / zoom)
+        oy = ay * (height - height / zoom)
+
+        matrices = np.zeros((frames, 2, 3), dtype=np.float64)
+        matrices[:, 0, 0] = zoom
+        matrices[:, 1, 1] = zoom
+        matrices[:, 0, 2] = -zoom * ox
+        matrices[:, 1, 2] = -zoom * oy
+        return matrices
+
+    @staticmethod
+    def crops(matrices: np.ndarray, width: int, height: int) -> np.ndarray:
+        """Integer crop windows (x, y, w, h) per frame for the same schedule"""
+        zoom = matrices[:, 0, 0]
+        crop_w = np.clip(np.rint(width / zoom), 1, width).astype(np.int64)
+        crop_h = np.clip(np.rint(height / zoom), 1, height).astype(np.int64)
+        x = np.clip(np.rint(-matrices[:, 0, 2] / zoom), 0, width - crop_w).astype(np.int64)
+        y = np.clip(np.rint(-matrices[:, 1, 2] / zoom), 0, height - crop_h).astype(np.int64)
+        return np.stack([x, y, crop_w, crop_h], axis=1)
+
+    def render(self, img: np.ndarray, frames: int, ring):
+        """Yield frames; each is written into ring.next(...) and reused later"""
+        h, w = img.shape[:2]
+        matrices = self.schedule(frames, w, h)
+
+        if self.subpixel:
+            for matrix in matrices:
+                yield cv2.warpAffine(img, matrix, (w, h), dst=ring.next(img.shape),
+                                     flags=self.interpolation, borderMode=cv2.BORDER_REPLICATE)
+            return
+
+        for x, y, cw, ch in self.crops(matrices, w, h).tolist():
+            yield cv2.resize(img[y:y+ch, x:x+cw], (w, h), dst=ring.next(img.shape),
+                             interpolation=self.interpolation)
@@ -0,0 +1,175 @@
+# backend/local_image_server.py
+# Local stand-in for the image backend - serves synthetic PNGs with
+# configurable latency and error rate, for offline load tests and benchmarks
+#
+#   python -m backend.local_image_server --port 8765 --latency 2 --error-rate 0.1
+#   IMAGE_BACKEND_URL=http://127.0.0.1:8765 streamlit run app.py
+
+import argparse
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_SIDE = 2048
+NOISE_ROWS = 24  # incompressible band so files are realistically sized
+
+
+def synthetic_png(width: int, height: int, seed: int) -> bytes:
+    """Diagonal colour stripes plus a noise band - deterministic per seed"""
+    rng = random.Random(seed)
+    r, g, b = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+
+    base = bytearray()
+    for x in range(width):
+        base += bytes(((r + x) % 256, (g + x // 2) % 256, (b + x // 3) % 256))
+    base = bytes(base)
+    stride = width * 3
+
+    noise_start = rng.randrange(max(1, height - NOISE_ROWS))
+    rows = []
+    for y in range(height):
+        if noise_start <= y < noise_start + NOISE_ROWS:
+            row = rng.randbytes(stride)
+        else:
+            shift = (y * 3) % stride
+            row = base[shift:] + base[:shift]
+        rows.append(b"\x00" + row)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 1))
+            + chunk(b"IEND", b""))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "LocalImageServer/1.0"
+
+    def do_GET(self):
+        cfg = self.server.config
+        url = urlparse(self.path)
+        if not url.path.startswith("/prompt/"):
+            self.send_error(404)
+            return
+
+        params = parse_qs(url.query)
+        try:
+            width = min(MAX_SIDE, max(16, int(params.get("width", ["1024"])[0])))
+            height = min(MAX_SIDE, max(16, int(params.get("height", ["1024"])[0])))
+            seed = int(params.get("seed", ["0"])[0])
+        except ValueError:
+            self.send_error(400)
+            return
+
+        with cfg["lock"]:
+            cfg["requests"] += 1
+            delay = max(0.0, cfg["latency"] + cfg["rng"].uniform(-cfg["jitter"], cfg["jitter"]))
+            fail = cfg["rng"].random() < cfg["error_rate"]
+
+        time.sleep(delay)
+
+        if fail:
+            with cfg["lock"]:
+                cfg["errors"] += 1
+            self.send_error(cfg["error_status"])
+            return
+
+        body = synthetic_png(width, height, seed)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+class LocalImageServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 seed: int = 0):
+        """port=0 picks a free port; see base_url after start()"""
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = {
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "error_status": error_status,
+            "rng": random.Random(seed),
+            "lock": threading.Lock(),
+            "requests": 0,
+            "errors": 0,
+        }
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> dict:
+        cfg = self.httpd.config
+        with cfg["lock"]:
+            return {"requests": cfg["requests"], "errors": cfg["errors"]}
+
+    def configure(self, **settings):
+        """Change latency / jitter / error_rate / error_status while running"""
+        cfg = self.httpd.config
+        with cfg["lock"]:
+            for key, value in settings.items():
+                if key not in ("latency", "jitter", "error_rate", "error_status"):
+                    raise KeyError(key)
+                cfg[key] = value
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name="local-image-server", daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic image backend for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    server = LocalImageServer(args.host, args.port, args.latency, args.jitter,
+                              args.error_rate, args.error_status)
+    print(f"🖼️  Local image backend on {server.base_url}")
+    print(f"   Latency {args.latency}s ±{args.jitter}s, error rate {args.error_rate:.0%}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
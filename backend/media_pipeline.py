@@ -0,0 +1,114 @@
+# backend/media_pipeline.py
+# Overlapped media stages - narration and frame preparation run while the
+# images are still downloading, encoding starts once its inputs are ready
+#
+#   story ──► TTS + ffprobe ─────────────────────────┐
+#   image fetch ──► decode + resize (per image) ─────┴──► encode video + audio
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from backend.scene_generator import VideoGenerator
+
+# Frame preparation is mostly OpenCV, which releases the GIL
+DEFAULT_WORKERS = min(4, (os.cpu_count() or 2))
+
+
+class MediaPipeline:
+    def __init__(self, sid: str, session: str = "default", story: str = None,
+                 effects: bool = True, make_video: bool = True,
+                 workers: int = DEFAULT_WORKERS, video: VideoGenerator = None):
+        self.sid = sid
+        self.story = story
+        self.effects = effects
+        self.make_video = make_video
+        self.video = video if video is not None or not make_video else VideoGenerator(session=session)
+        # One extra worker so narration never waits behind frame jobs
+        self.pool = ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix="media")
+        self.audio_future = None
+        self.frame_futures = {}
+        self.timings = {}
+        self.started = None
+
+    def _timed(self, stage: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def start(self):
+        """Kick off narration - it only needs the story text"""
+        self.started = time.perf_counter()
+        if self.make_video and self.story:
+            self.audio_future = self.pool.submit(self._timed, "audio", self.video.prepare_audio,
+                                                 self.story, self.sid)
+        return self
+
+    def add_image(self, idx: int, image):
+        """on_image hook - prepare this scene's frame while the others download"""
+        if self.make_video and image is not None:
+            self.frame_futures[idx] = self.pool.submit(self._timed, "frames",
+                                                       self.video.prepare_frame, image)
+
+    def finish(self) -> Optional[str]:
+        """Wait for the prepared inputs, encode, and return the video path"""
+        try:
+            if not self.make_video:
+                return None
+
+            frames = []
+            for idx in sorted(self.frame_futures):
+                frame = self.frame_futures[idx].result()
+                if frame is not None:
+                    frames.append(frame)
+
+            audio = self.audio_future.result() if self.audio_future else (None, None)
+            return self._timed("encode", self.video.render_video, frames, self.sid,
+                               self.story, self.effects, audio)
+        finally:
+            self.close()
+            if self.started is not None:
+                total = time.perf_counter() - self.started
+                busy = ", ".join(f"{k} {v:.1f}s" for k, v in self.timings.items())
+                print(f"⏱️  Media pipeline: {total:.1f}s end to end ({busy})")
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def generate_story_media(story: str, num_images: int, user_prompt: str = "",
+                         sid: str = None, session: str = "default",
+                         make_video: bool = True, effects: bool = True,
+                         on_image=None, **image_options) -> tuple:
+    """
+    Fetch images and build the video with the stages overlapped.
+    Returns (images, video_path); image_options go to generate_images_from_story.
+    """
+    from backend.images_generator import generate_images_from_story
+
+    pipeline = MediaPipeline(sid, session=session, story=story, effects=effects,
+                             make_video=make_video).start()
+
+    def image_arrived(idx, img):
+        pipeline.add_image(idx, img)
+        if on_image:
+            on_image(idx, img)
+
+    try:
+        images = generate_images_from_story(story_text=story, num_images=num_images,
+                                            user_prompt=user_prompt, session=session,
+                                            job_id=sid, on_image=image_arrived, **image_options)
+    except Exception:
+        pipeline.close()
+        raise
+
+    return images, pipeline.finish()
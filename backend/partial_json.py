@@ -0,0 +1,134 @@
+# backend/partial_json.py
+# Incremental JSON reading for streamed model output - string fields can be
+# shown while the object is still arriving, and truncated or slightly
+# malformed objects are repaired locally instead of being thrown away
+
+import json
+import re
+from typing import Optional, Tuple
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _decode_partial_string(text: str, start: int) -> Tuple[str, bool]:
+    """
+    Decode a JSON string body beginning at text[start] (just after the
+    opening quote). Returns (value so far, closed). An escape sequence cut
+    off at the end of the buffer is left out until the rest arrives.
+    """
+    out = []
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            return "".join(out), True
+        if ch != "\\":
+            out.append(ch)
+            i += 1
+            continue
+        if i + 1 >= n:
+            break
+        esc = text[i + 1]
+        if esc == "u":
+            digits = text[i + 2:i + 6]
+            if len(digits) < 4:
+                break
+            try:
+                out.append(chr(int(digits, 16)))
+            except ValueError:
+                out.append(digits)
+            i += 6
+        else:
+            out.append(_ESCAPES.get(esc, esc))
+            i += 2
+    return "".join(out), False
+
+
+def _close_json(text: str) -> str:
+    """Close an unterminated string and any open objects/arrays"""
+    stack = []
+    in_string = escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            stack.append("}")
+        elif ch == "[":
+            stack.append("]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        if escaped:
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> dict:
+    """
+    Parse a model's JSON object, tolerating code fences, text around the
+    object, raw newlines in strings, trailing commas and truncation.
+    Raises json.JSONDecodeError if nothing usable is left.
+    """
+    text = text.replace("```json", "").replace("```", "").strip()
+    start = text.find("{")
+    if start < 0:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    text = text[start:]
+
+    decoder = json.JSONDecoder(strict=False)
+    try:
+        return decoder.raw_decode(text)[0]
+    except json.JSONDecodeError as e:
+        error = e
+
+    candidate = _TRAILING_COMMA.sub(r"\1", text)
+    # Drop trailing fields one at a time until the rest closes cleanly
+    for _ in range(4):
+        try:
+            return decoder.raw_decode(_close_json(candidate))[0]
+        except json.JSONDecodeError:
+            cut = candidate.rfind(",")
+            if cut <= 0:
+                break
+            candidate = candidate[:cut]
+    raise error
+
+
+class PartialJSONParser:
+    """Accumulates streamed chunks of one JSON object"""
+
+    def __init__(self):
+        self.text = ""
+        self._field_starts = {}
+
+    def feed(self, chunk: str):
+        self.text += chunk
+
+    def string_field(self, name: str) -> Optional[str]:
+        """Current (possibly incomplete) value of a top-level string field"""
+        start = self._field_starts.get(name)
+        if start is None:
+            match = re.search(r'"%s"\s*:\s*"' % re.escape(name), self.text)
+            if not match:
+                return None
+            start = self._field_starts[name] = match.end()
+        return _decode_partial_string(self.text, start)[0]
+
+    def result(self) -> dict:
+        return repair_json(self.text)
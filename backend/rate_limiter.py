@@ -0,0 +1,94 @@
+# backend/rate_limiter.py
+# Token-bucket rate limiter - replaces fixed sleeps between backend calls
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        rate: tokens added per second (<= 0 means unlimited)
+        capacity: maximum burst size (defaults to max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now, never blocks"""
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until tokens would be available (0 = now), without taking them"""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def credit(self, tokens: float):
+        """Give back unused tokens; a negative value charges extra and may go below zero"""
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the upstream reported a rate limit"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available. Returns False on timeout."""
+        if self.rate <= 0:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name: str, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """Process-wide bucket per backend, so every session together stays within its limits"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = TokenBucket(rate, capacity)
+        return _limiters[name]
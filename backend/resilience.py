@@ -0,0 +1,124 @@
+# backend/resilience.py
+# Retries with jittered exponential backoff, hedged requests and a circuit breaker
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 10.0, jitter: bool = True):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt+1 ("full jitter" exponential backoff)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    """
+    closed    -> requests flow, consecutive failures are counted
+    open      -> requests fail fast until reset_timeout has passed
+    half_open -> one trial request; success closes, failure re-opens.
+                 A trial that never reports back is given up on after
+                 trial_timeout, so a lost one can't wedge the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 trial_timeout: float = 150.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trial_timeout = trial_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and self._trial_in_flight:
+                if time.monotonic() - self._trial_started >= self.trial_timeout:
+                    self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_started = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_neutral(self):
+        """
+        The backend answered but rejected this request (e.g. a 4xx for a bad
+        prompt) - says nothing about its health. Frees a half-open trial slot.
+        """
+        with self.lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⚡ Circuit opened after {self.failures} failures - failing fast for {self.reset_timeout:.0f}s")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+def hedged_call(fn: Callable, hedge_after: Optional[float],
+                can_hedge: Callable[[], bool] = None):
+    """
+    Run fn(); if it hasn't finished after hedge_after seconds, start one
+    duplicate and return whichever succeeds first. The slower copy is
+    left to finish in the background and its result is discarded.
+    """
+    if not hedge_after or hedge_after <= 0:
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        pending = {pool.submit(fn)}
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done and (can_hedge is None or can_hedge()):
+            pending.add(pool.submit(fn))
+
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+    finally:
+        pool.shutdown(wait=False)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str, **settings) -> CircuitBreaker:
+    """Process-wide breaker per backend, shared by every session"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(**settings)
+        return _breakers[name]
@@ -1,41 +1,117 @@
 # backend/scene_generator.py
 # FASTER VERSION - Quicker TTS speech for shorter videos
 
-import cv2
-import numpy as np
-from pathlib import Path
-import base64
-from PIL import Image
 import io
+import itertools
 import os
 import re
 import subprocess
 
-try:
-    from gtts import gTTS
-    TTS_OK = True
-except:
-    TTS_OK = False
+from backend.artifact_store import ArtifactStore, get_artifact_store
+from backend.image_handle import ImageHandle
+from backend.video_encoder import FFmpegPipeEncoder, ffmpeg_available
+
+# cv2 / numpy / PIL / gTTS take most of a second to import. They are loaded
+# on first use so importing this module (e.g. for VIDEO_SIZE) stays cheap.
+cv2 = None
+np = None
+Image = None
+gTTS = None
+TTS_OK = None  # unknown until _load_tts() has run
+
+def _load_media_libs():
+    """Import the video stack into module globals on first use"""
+    global cv2, np, Image
+    if cv2 is None:
+        import numpy as _np
+        from PIL import Image as _Image
+        import cv2 as _cv2
+        np, Image = _np, _Image
+        cv2 = _cv2
+
+def _load_tts() -> bool:
+    global gTTS, TTS_OK
+    if TTS_OK is None:
+        try:
+            from gtts import gTTS as _gTTS
+            gTTS = _gTTS
+            TTS_OK = True
+        except ImportError:
+            TTS_OK = False
+    return TTS_OK
+
+# Output frame size - the image stage requests this size directly
+VIDEO_SIZE = (1280, 720)
+
+# Effect frames are rendered into a few reused buffers instead of one new
+# array per frame, so memory stays flat however long a scene runs
+FRAME_RING_SLOTS = 2
+
+
+class FrameRing:
+    """
+    Preallocated output frames, handed out round-robin. A frame yielded by
+    an effect is only valid until the ring comes back to it - consumers that
+    keep frames (rather than write them straight out) must copy them.
+    """
+
+    def __init__(self, slots: int = FRAME_RING_SLOTS):
+        _load_media_libs()
+        self.slots = max(1, slots)
+        self.buffers = []
+        self.index = 0
+
+    def next(self, shape):
+        if not self.buffers or self.buffers[0].shape != tuple(shape):
+            self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self.slots)]
+            self.index = 0
+        buf = self.buffers[self.index]
+        self.index = (self.index + 1) % self.slots
+        return buf
 
 class VideoGenerator:
-    def __init__(self):
-        self.videos_dir = Path("assets/videos")
-        self.videos_dir.mkdir(parents=True, exist_ok=True)
-        self.audio_dir = Path("assets/audio")
-        self.audio_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, session: str = "default", store: ArtifactStore = None,
+                 pans: list = None, easing: str = "linear", transition: str = "crossfade",
+                 workers: int = None):
+        """
+        Videos and audio are written under the session's namespace, one folder per sid
+        pans: Ken Burns pan per scene, cycled (see backend/ken_burns.py PANS)
+        easing: Ken Burns easing curve (see EASINGS)
+        transition: between scenes (see backend/transitions.py TRANSITIONS)
+        workers: processes rendering scenes in parallel (default VIDEO_RENDER_WORKERS
+            or 1; see backend/segment_renderer.py)
+        """
+        _load_media_libs()
+        from backend.ken_burns import DEFAULT_PAN
+        from backend.transitions import Transition
+        self.store = store if store is not None else get_artifact_store()
+        self.session = session
         
         self.fps = 30
-        self.size = (1280, 720)
+        self.size = VIDEO_SIZE
+        self.ring = FrameRing()
+        self.pans = pans or [DEFAULT_PAN]
+        self.easing = easing
+        self.transition = Transition(transition)
+        if workers is None:
+            workers = int(os.getenv("VIDEO_RENDER_WORKERS", "1"))
+        self.workers = max(1, workers)
     
-    def b64_to_img(self, b64):
-        """Convert base64 to numpy array"""
+    def decode_image(self, image):
+        """
+        Decode an ImageHandle (or legacy base64 string) straight to a BGR array.
+        OpenCV decodes from the raw bytes - no base64 or PIL round trip.
+        """
         try:
-            if not b64:
+            handle = ImageHandle.coerce(image)
+            if handle is None:
                 return None
-            data = base64.b64decode(b64)
-            img = Image.open(io.BytesIO(data))
-            img = img.convert('RGB')
-            arr = np.array(img)
+            buf = np.frombuffer(handle.read_bytes(), dtype=np.uint8)
+            arr = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+            if arr is None:
+                # Formats OpenCV can't read - fall back to PIL
+                img = Image.open(io.BytesIO(buf.tobytes())).convert('RGB')
+                arr = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
             print(f"    ✓ Decoded: {arr.shape}")
             return arr
         except Exception as e:
@@ -43,18 +119,29 @@ class VideoGenerator:
             return None
     
     def resize_for_video(self, img):
-        """Resize image maintaining aspect ratio"""
+        """Resize BGR image maintaining aspect ratio"""
         try:
             h, w = img.shape[:2]
             target_w, target_h = self.size
             
+            # Already fetched at video size - nothing to do
+            if (w, h) == (target_w, target_h):
+                print(f"    ✓ Already {self.size}")
+                return img
+            
             # Calculate scaling
             scale = min(target_w / w, target_h / h)
             new_w = int(w * scale)
             new_h = int(h * scale)
             
-            # Resize
-            resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+            # Resize - INTER_AREA is cheaper and cleaner for shrinking,
+            # LANCZOS4 only when we have to enlarge
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LANCZOS4
+            resized = cv2.resize(img, (new_w, new_h), interpolation=interpolation)
+            
+            if (new_w, new_h) == (target_w, target_h):
+                print(f"    ✓ Resized to {self.size}")
+                return resized
             
             # Create canvas and center image
             canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
@@ -62,9 +149,6 @@ class VideoGenerator:
             y_offset = (target_h - new_h) // 2
             canvas[y_offset:y_offset+new_h, x_offset:x_offset+new_w] = resized
             
-            # Convert RGB to BGR for OpenCV
-            canvas = cv2.cvtColor(canvas, cv2.COLOR_RGB2BGR)
-            
             print(f"    ✓ Resized to {self.size}")
             return canvas
         except Exception as e:
@@ -72,37 +156,14 @@ class VideoGenerator:
             return None
     
     def create_fade(self, img1, img2, frames):
-        """Smooth fade transition"""
-        result = []
-        for i in range(frames):
-            alpha = i / frames
-            blend = cv2.addWeighted(img1, 1-alpha, img2, alpha, 0)
-            result.append(blend)
-        return result
+        """Scene transition (crossfade by default) - yields frames from the reusable ring"""
+        return self.transition.render(img1, img2, frames, self.ring)
     
-    def create_zoom(self, img, frames):
-        """Ken Burns effect"""
-        result = []
-        h, w = img.shape[:2]
-        
-        for i in range(frames):
-            progress = i / frames
-            zoom = 1 + 0.08 * progress
-            
-            crop_w = int(w / zoom)
-            crop_h = int(h / zoom)
-            
-            x = int((w - crop_w) * progress * 0.5)
-            y = int((h - crop_h) * progress * 0.5)
-            
-            x = max(0, min(x, w - crop_w))
-            y = max(0, min(y, h - crop_h))
-            
-            cropped = img[y:y+crop_h, x:x+crop_w]
-            zoomed = cv2.resize(cropped, (w, h), interpolation=cv2.INTER_LINEAR)
-            result.append(zoomed)
-        
-        return result
+    def create_zoom(self, img, frames, pan: str = None):
+        """Ken Burns effect - yields frames from the reusable ring"""
+        from backend.ken_burns import KenBurns
+        engine = KenBurns(pan=pan or self.pans[0], easing=self.easing)
+        return engine.render(img, frames, self.ring)
     
     def calculate_duration_smart(self, story: str, num_images: int) -> tuple:
         """
@@ -148,7 +209,7 @@ class VideoGenerator:
     
     def generate_audio(self, story: str, sid: str):
         """Generate TTS audio with NORMAL SPEED (not slow)"""
-        if not TTS_OK:
+        if not _load_tts():
             print("   ⚠️  gTTS not installed - Please install: pip install gtts")
             return None
         
@@ -159,7 +220,7 @@ class VideoGenerator:
             # Clean text
             clean = re.sub(r'\s+', ' ', story).strip()
             
-            path = self.audio_dir / f"audio_{sid}.mp3"
+            path = self.store.path_for("audio", self.session, sid, f"audio_{sid}.mp3")
             
             words = len(clean.split())
             print(f"   Words: {words}")
@@ -168,7 +229,8 @@ class VideoGenerator:
             # Use slow=False for NORMAL/FASTER speech
             # This makes videos shorter
             tts = gTTS(text=clean, lang='en', slow=False)
-            tts.save(str(path))
+            with self.store.atomic_path(path) as tmp:
+                tts.save(tmp)
             
             if os.path.exists(path):
                 size = os.path.getsize(path) / 1024
@@ -213,11 +275,12 @@ class VideoGenerator:
             result = subprocess.run(cmd, capture_output=True, timeout=180)
             
             if result.returncode == 0 and os.path.exists(output):
-                os.remove(video_path)
-                os.rename(output, video_path)
+                os.replace(output, video_path)
                 print("   ✅ Audio merged!")
                 return True
             else:
+                if os.path.exists(output):
+                    os.remove(output)
                 error = result.stderr.decode() if result.stderr else "Unknown"
                 print(f"   ❌ FFmpeg failed: {error}")
                 return False
@@ -229,27 +292,132 @@ class VideoGenerator:
             print(f"   ❌ Audio merge error: {e}")
             return False
     
-    def create_slideshow_video(self, images_b64, sid, story=None, effects=True):
-        """Create FASTER video with normal speed narration"""
+    def prepare_frame(self, image):
+        """Decode one image and fit it to the video frame - safe to run in a worker thread"""
+        img_arr = self.decode_image(image)
+        if img_arr is None:
+            return None
+        return self.resize_for_video(img_arr)
+    
+    def probe_duration(self, path: str):
+        """Media duration in seconds via ffprobe, or None"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 
+                 'format=duration', '-of', 
+                 'default=noprint_wrappers=1:nokey=1', path],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            if result.returncode == 0:
+                return float(result.stdout.strip())
+        except Exception:
+            pass
+        return None
+    
+    def prepare_audio(self, story: str, sid: str):
+        """
+        Narration plus its measured duration: (audio_path, seconds).
+        Depends only on the story text, so it can run while images download.
+        """
+        if not story or not _load_tts():
+            return None, None
+        
+        audio_path = self.generate_audio(story, sid)
+        if not audio_path or not os.path.exists(audio_path):
+            return None, None
+        return audio_path, self.probe_duration(audio_path)
+    
+    def create_slideshow_video(self, images, sid, story=None, effects=True):
+        """
+        Create FASTER video with normal speed narration
+        images: list of ImageHandle (legacy base64 strings are still accepted)
+        Runs every stage in sequence - see backend/media_pipeline.py for the
+        overlapped version
+        """
         
         print(f"\n{'='*60}")
         print(f"🎬 CREATING VIDEO (FASTER)")
         print(f"{'='*60}\n")
         
-        print(f"📥 Received {len(images_b64)} images")
+        print(f"📥 Received {len(images)} images")
         
         # Process images
         processed = []
-        for i, b64 in enumerate(images_b64, 1):
-            if b64:
+        for i, image in enumerate(images, 1):
+            if image:
                 print(f"\n  Processing image {i}:")
-                img_arr = self.b64_to_img(b64)
-                if img_arr is not None:
-                    resized = self.resize_for_video(img_arr)
-                    if resized is not None:
-                        processed.append(resized)
-                        print(f"  ✓ Image {i} ready")
+                resized = self.prepare_frame(image)
+                if resized is not None:
+                    processed.append(resized)
+                    print(f"  ✓ Image {i} ready")
+        
+        audio = self.prepare_audio(story, sid) if processed else (None, None)
+        return self.render_video(processed, sid, story, effects, audio)
+    
+    def open_cv2_writer(self, video_path):
+        """OpenCV writer for when ffmpeg isn't available, or None"""
+        # H.264 codec
+        fourcc = cv2.VideoWriter_fourcc(*'avc1')
+        writer = cv2.VideoWriter(
+            str(video_path), 
+            fourcc, 
+            self.fps, 
+            self.size,
+            isColor=True
+        )
+        
+        if not writer.isOpened():
+            print("   ⚠️  Trying fallback...")
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            writer = cv2.VideoWriter(str(video_path), fourcc, self.fps, self.size, isColor=True)
+        
+        return writer if writer.isOpened() else None
+    
+    def segment_frames(self, idx, img, next_img, effects, frames_per_image, transition_frames):
+        """Scene idx, then its transition into next_img (None for the last scene)"""
+        if effects:
+            yield from self.create_zoom(img, frames_per_image,
+                                        pan=self.pans[idx % len(self.pans)])
+        else:
+            yield from itertools.repeat(img, frames_per_image)
         
+        # Transitions
+        if next_img is not None and effects and transition_frames > 0:
+            yield from self.create_fade(img, next_img, transition_frames)
+    
+    def write_frames(self, writer, processed, effects, frames_per_image, transition_frames) -> int:
+        """
+        Render every scene and transition into writer, returning the frame count.
+        Effects are generators, so each frame goes to the encoder as soon as
+        it's rendered and nothing piles up in memory.
+        """
+        total_frames = 0
+        
+        for idx, img in enumerate(processed):
+            print(f"  📹 Image {idx+1}/{len(processed)}...")
+            
+            next_img = processed[idx+1] if idx < len(processed) - 1 else None
+            written = 0
+            for frame in self.segment_frames(idx, img, next_img, effects,
+                                             frames_per_image, transition_frames):
+                writer.write(frame)
+                written += 1
+            total_frames += written
+            
+            print(f"  ✓ {written} frames")
+        
+        # The pipe encoder drops frames it could no longer deliver to ffmpeg
+        if isinstance(writer, FFmpegPipeEncoder):
+            return writer.frames
+        return total_frames
+    
+    def render_video(self, processed, sid, story=None, effects=True, audio=(None, None)):
+        """
+        Encode prepared frames (BGR arrays at self.size) into the final video.
+        audio: (audio_path, duration) from prepare_audio
+        """
         if not processed:
             print("\n✗ No images processed")
             return None
@@ -264,64 +432,26 @@ class VideoGenerator:
             per_image = 4
             print(f"   ⏱️  Default: {per_image:.1f}s per image")
         
-        # Generate FAST audio
-        audio_path = None
-        actual_audio_duration = None
+        # Match video to the narration when we know its real length
+        audio_path, actual_audio_duration = audio
         
-        if story and TTS_OK:
-            audio_path = self.generate_audio(story, sid)
+        if actual_audio_duration:
+            print(f"\n   🎵 Audio: {actual_audio_duration:.1f}s")
             
-            if audio_path and os.path.exists(audio_path):
-                try:
-                    # Get actual audio duration
-                    import subprocess
-                    result = subprocess.run(
-                        ['ffprobe', '-v', 'error', '-show_entries', 
-                         'format=duration', '-of', 
-                         'default=noprint_wrappers=1:nokey=1', audio_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if result.returncode == 0:
-                        actual_audio_duration = float(result.stdout.strip())
-                        print(f"\n   🎵 Audio: {actual_audio_duration:.1f}s")
-                        
-                        # Match video to audio
-                        total_dur = actual_audio_duration + 0.5
-                        per_image = total_dur / len(processed)
-                        
-                        print(f"   🎬 Video adjusted:")
-                        print(f"   Duration: {total_dur:.1f}s")
-                        print(f"   Per image: {per_image:.1f}s")
-                except:
-                    print(f"   ℹ️  Using calculated time")
-                    pass
-        
-        # Create video
+            total_dur = actual_audio_duration + 0.5
+            per_image = total_dur / len(processed)
+            
+            print(f"   🎬 Video adjusted:")
+            print(f"   Duration: {total_dur:.1f}s")
+            print(f"   Per image: {per_image:.1f}s")
+        elif audio_path:
+            print(f"   ℹ️  Using calculated time")
+        
+        # Create video - rendered under a temporary name and moved into
+        # place at the end so the page never sees a half-written file
         video_file = f"story_{sid}.mp4"
-        video_path = self.videos_dir / video_file
-        
-        print(f"\n🎥 Writing video...\n")
-        
-        # H.264 codec
-        fourcc = cv2.VideoWriter_fourcc(*'avc1')
-        writer = cv2.VideoWriter(
-            str(video_path), 
-            fourcc, 
-            self.fps, 
-            self.size,
-            isColor=True
-        )
-        
-        if not writer.isOpened():
-            print("   ⚠️  Trying fallback...")
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(str(video_path), fourcc, self.fps, self.size, isColor=True)
-        
-        if not writer.isOpened():
-            print("✗ Video writer failed")
-            return None
+        final_path = self.store.path_for("videos", self.session, sid, video_file)
+        video_path = final_path.with_name(f".tmp_{video_file}")
         
         # Calculate frames
         frames_per_image = int(per_image * self.fps)
@@ -331,35 +461,55 @@ class VideoGenerator:
         print(f"   🎞️  Frames: {frames_per_image}")
         if effects:
             print(f"   🔄 Transitions: {transition_frames}")
-        print()
         
-        total_frames = 0
+        print(f"\n🎥 Writing video...\n")
         
-        # Write frames
-        for idx, img in enumerate(processed):
-            print(f"  📹 Image {idx+1}/{len(processed)}...")
-            
-            if effects:
-                frames = self.create_zoom(img, frames_per_image)
+        has_audio = bool(audio_path and os.path.exists(audio_path))
+        audio_merged = False
+        total_frames = None
+        
+        # Parallel: each scene is its own segment in a process pool, then the
+        # segments are joined by stream copy with the narration muxed in
+        if self.workers > 1 and len(processed) > 1 and ffmpeg_available():
+            from backend.segment_renderer import render_segments
+            print(f"   🧩 {len(processed)} segments on {self.workers} processes\n")
+            total_frames = render_segments(self, processed, video_path,
+                                           audio_path if has_audio else None, effects,
+                                           frames_per_image, transition_frames)
+            if total_frames is None:
+                print("   ⚠️  Segment render failed - encoding in one pass...\n")
             else:
-                frames = [img] * frames_per_image
-            
-            for frame in frames:
-                writer.write(frame)
-                total_frames += 1
-            
-            print(f"  ✓ {len(frames)} frames")
-            
-            # Transitions
-            if idx < len(processed) - 1 and effects and transition_frames > 0:
-                trans_frames = self.create_fade(img, processed[idx+1], transition_frames)
-                for frame in trans_frames:
-                    writer.write(frame)
-                    total_frames += 1
-                print(f"  ✓ Transition ({transition_frames})")
-        
-        writer.release()
-        cv2.destroyAllWindows()
+                audio_merged = has_audio
+        
+        # One pass: frames piped into ffmpeg, narration muxed in the same run
+        if total_frames is None and ffmpeg_available():
+            print(f"   🚀 Single-pass ffmpeg encode{' + audio' if has_audio else ''}\n")
+            encoder = FFmpegPipeEncoder(video_path, self.size, self.fps,
+                                        audio_path=audio_path if has_audio else None)
+            total_frames = self.write_frames(encoder, processed, effects,
+                                             frames_per_image, transition_frames)
+            if not encoder.release():
+                total_frames = None
+            if total_frames is None:
+                print("   ⚠️  Falling back to OpenCV writer...\n")
+            else:
+                audio_merged = has_audio
+        
+        # -shortest cut the muxed video to the narration - ffmpeg may still
+        # have read the frames past that point, so count from the audio length
+        if audio_merged and actual_audio_duration:
+            total_frames = min(total_frames, round(actual_audio_duration * self.fps))
+        
+        # Fallback: OpenCV writes the video, merge_audio adds the narration
+        if total_frames is None:
+            writer = self.open_cv2_writer(video_path)
+            if writer is None:
+                print("✗ Video writer failed")
+                return None
+            total_frames = self.write_frames(writer, processed, effects,
+                                             frames_per_image, transition_frames)
+            writer.release()
+            cv2.destroyAllWindows()
         
         # Verify
         if not os.path.exists(video_path):
@@ -369,6 +519,7 @@ class VideoGenerator:
         size_bytes = os.path.getsize(video_path)
         if size_bytes < 1000:
             print(f"\n✗ Too small: {size_bytes} bytes")
+            os.remove(video_path)
             return None
         
         duration = total_frames / self.fps
@@ -389,8 +540,9 @@ class VideoGenerator:
         print(f"   ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         
         # Merge audio
-        audio_merged = False
-        if audio_path and os.path.exists(audio_path):
+        if audio_merged:
+            print(f"\n   🎵 Audio: {audio_path} (muxed while encoding)")
+        elif has_audio:
             print(f"\n   🎵 Audio: {audio_path}")
             audio_merged = self.merge_audio(str(video_path), audio_path)
             
@@ -404,21 +556,23 @@ class VideoGenerator:
             else:
                 print(f"   ℹ️  Silent video")
         
+        os.replace(video_path, final_path)
+        
         print(f"\n{'='*60}")
         print(f"✨ COMPLETE!")
         print(f"   Images: {len(processed)}")
         print(f"   Audio: {'✅ MERGED (FAST)' if audio_merged else '❌ SKIPPED'}")
-        print(f"   File: {video_file}")
+        print(f"   File: {final_path}")
         print(f"{'='*60}\n")
         
-        return str(video_path)
+        return str(final_path)
 
 
-def create_slideshow_video(images_b64, sid, story=None, effects=True):
+def create_slideshow_video(images, sid, story=None, effects=True, session="default"):
     """Create faster slideshow video"""
     try:
-        gen = VideoGenerator()
-        return gen.create_slideshow_video(images_b64, sid, story, effects)
+        gen = VideoGenerator(session=session)
+        return gen.create_slideshow_video(images, sid, story, effects)
     except Exception as e:
         print(f"✗ Video error: {e}")
         import traceback
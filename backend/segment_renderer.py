@@ -0,0 +1,124 @@
+# backend/segment_renderer.py
+# Multi-core rendering - each scene plus its outgoing transition is rendered
+# and encoded as its own mp4 in a process pool. Every segment uses the same
+# encoder settings, so ffmpeg's concat demuxer can join them by stream copy,
+# and the narration is muxed in during that same copy.
+
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from backend.video_encoder import AUDIO_ARGS, FFMPEG, FINISH_TIMEOUT, FFmpegPipeEncoder
+
+
+def _pool_context():
+    """
+    Never fork: the parent is a multi-threaded server that has already used
+    OpenCV, and a forked child can deadlock on a lock some other thread held.
+    forkserver where the platform has it, spawn otherwise (Windows).
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _render_segment(job: dict) -> Optional[int]:
+    """Worker process: encode one segment, returning its frame count or None"""
+    from backend.scene_generator import VideoGenerator
+
+    gen = VideoGenerator(workers=1, **job["settings"])
+    encoder = FFmpegPipeEncoder(job["path"], gen.size, gen.fps, threads=job["threads"])
+    frames = 0
+    for frame in gen.segment_frames(job["idx"], job["img"], job["next_img"], job["effects"],
+                                    job["frames_per_image"], job["transition_frames"]):
+        encoder.write(frame)
+        frames += 1
+    return frames if encoder.release() else None
+
+
+def _concat_line(path: Path) -> str:
+    # concat demuxer quoting: close the quote, escaped quote, reopen
+    escaped = path.resolve().as_posix().replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def concat_segments(paths: list, output, audio_path: Optional[str] = None) -> bool:
+    """Join segments without re-encoding the video, adding the narration if given"""
+    list_file = Path(paths[0]).parent / "segments.txt"
+    list_file.write_text("".join(_concat_line(Path(p)) for p in paths), encoding="utf-8")
+
+    cmd = [FFMPEG, '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+    if audio_path:
+        cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+    cmd += ['-c:v', 'copy']
+    if audio_path:
+        cmd += AUDIO_ARGS + ['-shortest']
+    cmd += ['-movflags', '+faststart', '-f', 'mp4', str(output)]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=FINISH_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        print("   ❌ FFmpeg concat timed out")
+        return False
+    if result.returncode != 0:
+        error = result.stderr.decode(errors="replace").strip() if result.stderr else "Unknown"
+        print(f"   ❌ FFmpeg concat failed: {error}")
+        return False
+    return True
+
+
+def render_segments(gen, processed, video_path, audio_path, effects,
+                    frames_per_image, transition_frames) -> Optional[int]:
+    """
+    Render processed (prepared BGR frames) across gen.workers processes into
+    video_path. Returns the total frame count, or None if any step failed.
+    """
+    video_path = Path(video_path)
+    workers = min(gen.workers, len(processed))
+    # Leave x264 the cores the pool isn't using rather than oversubscribing
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    settings = {
+        "session": gen.session,
+        "pans": gen.pans,
+        "easing": gen.easing,
+        "transition": gen.transition.kind,
+    }
+
+    folder = Path(tempfile.mkdtemp(dir=video_path.parent, prefix=".segments_"))
+    try:
+        jobs = []
+        for idx, img in enumerate(processed):
+            jobs.append({
+                "idx": idx,
+                "img": img,
+                "next_img": processed[idx+1] if idx < len(processed) - 1 else None,
+                "path": str(folder / f"segment_{idx:04d}.mp4"),
+                "effects": effects,
+                "frames_per_image": frames_per_image,
+                "transition_frames": transition_frames,
+                "threads": threads,
+                "settings": settings,
+            })
+
+        total_frames = 0
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            for job, frames in zip(jobs, pool.map(_render_segment, jobs)):
+                if frames is None:
+                    print(f"  ✗ Segment {job['idx']+1} failed")
+                    return None
+                print(f"  ✓ Segment {job['idx']+1}/{len(jobs)}: {frames} frames")
+                total_frames += frames
+
+        if not concat_segments([job["path"] for job in jobs], video_path, audio_path):
+            return None
+        return total_frames
+    except Exception as e:
+        print(f"   ❌ Segment render error: {e}")
+        return None
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
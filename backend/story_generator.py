@@ -1,24 +1,72 @@
 # backend/story_generator.py
 # FIXED VERSION - No more KeyError for 'segment'
 
+import asyncio
 import os
+import threading
+import weakref
 from pathlib import Path
-from typing import Optional
-from dotenv import load_dotenv
-from groq import Groq
+from typing import List, Optional
 import json
 import random
 
-project_root = Path(__file__).parent.parent
-load_dotenv(project_root / ".env")
+from backend.completion_cache import CompletionCache, get_completion_cache
+from backend.dialogue_memory import DialogueMemory
+from backend.groq_scheduler import (
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITY_STORY,
+    estimate_prompt_tokens, get_groq_scheduler,
+)
+from backend.partial_json import PartialJSONParser, repair_json
+from backend.word_budget import WordBudget, get_token_ratio, trim_to_budget
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not found in .env!")
+project_root = Path(__file__).parent.parent
 
-client = Groq(api_key=GROQ_API_KEY)
 MODEL = "llama-3.3-70b-versatile"
 
+# Clients are built on first use - importing this module needs no
+# credentials, no network and no groq/httpx import
+_client = None
+_async_clients = weakref.WeakKeyDictionary()   # event loop -> AsyncGroq
+_client_lock = threading.Lock()
+
+def _groq_api_key() -> str:
+    from dotenv import load_dotenv
+    load_dotenv(project_root / ".env")
+    
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY not found in .env!")
+    return api_key
+
+def get_client():
+    """Process-wide sync Groq client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from groq import Groq
+            _client = Groq(api_key=_groq_api_key())
+        return _client
+
+def get_async_client():
+    """
+    AsyncGroq client for the running event loop. Its connection pool is bound
+    to that loop, so each loop (e.g. every asyncio.run) gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            from groq import AsyncGroq
+            client = _async_clients[loop] = AsyncGroq(api_key=_groq_api_key())
+        return client
+
+async def close_async_client():
+    """Close the running loop's client, if any - call before the loop ends"""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
 MYTHOLOGY_SCENARIOS = [
     {"epic": "Ramayana", "wise": "Ram", "user_role": "Lakshman"},
     {"epic": "Mahabharata", "wise": "Krishna", "user_role": "Arjuna"},
@@ -27,10 +75,182 @@ MYTHOLOGY_SCENARIOS = [
 def count_words(text: str) -> int:
     return len(text.split())
 
-def generate_emotion_story(emotion: str, user_idea: Optional[str] = None, 
-                          length: str = "medium", custom_words: int = None, 
-                          custom_paragraphs: int = None) -> str:
-    """Generate emotion-based story"""
+def _cache_lookup(system: str, prompt: str, temperature: float, max_tokens: int,
+                  use_cache: bool) -> tuple:
+    """Returns (cache, key, cached_text) - key is None when the request isn't cacheable"""
+    cache = get_completion_cache() if use_cache else None
+    if not cache or not cache.cacheable(temperature):
+        return None, None, None
+    
+    key = CompletionCache.make_key(MODEL, system, prompt, temperature, max_tokens)
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"⚡ Completion cache hit")
+    return cache, key, cached
+
+JSON_MODE = {"type": "json_object"}
+
+# Switched off the first time the API refuses JSON mode on a streamed request
+_json_mode_streaming = True
+
+def _chat_completion(system: str, prompt: str, temperature: float, max_tokens: int,
+                     use_cache: bool = True, json_mode: bool = False,
+                     priority: int = PRIORITY_STORY) -> str:
+    """
+    Single entry point for Groq chat completions, backed by the completion cache.
+    json_mode: constrain the output to a single JSON object
+    priority: scheduler class - PRIORITY_INTERACTIVE / PRIORITY_STORY / PRIORITY_BATCH
+    """
+    cache, key, cached = _cache_lookup(system, prompt, temperature, max_tokens, use_cache)
+    if cached is not None:
+        return cached
+    
+    extra = {"response_format": JSON_MODE} if json_mode else {}
+    estimate = estimate_prompt_tokens(system, prompt) + max_tokens
+    with get_groq_scheduler().slot(priority, estimate) as lease:
+        completion = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        lease.record_usage(getattr(completion, "usage", None))
+    
+    text = completion.choices[0].message.content.strip()
+    if key:
+        cache.put(key, text)
+    return text
+
+def _stream_usage(chunk):
+    """Groq reports token usage on the last stream chunk (under x_groq)"""
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+    return usage
+
+def _chat_completion_stream(system: str, prompt: str, temperature: float, max_tokens: int,
+                            use_cache: bool = True, target_words: int = None,
+                            json_mode: bool = False, priority: int = PRIORITY_STORY):
+    """
+    Streaming variant of _chat_completion - yields text chunks as Groq produces them.
+    With target_words the stream is stopped at a sentence boundary near that
+    length, and max_tokens (still the cache key and upper bound) is sized
+    from the measured words-per-token ratio.
+    json_mode is used when the API accepts it on streams; the caller is
+    expected to repair the JSON locally either way.
+    The scheduler slot is held until the stream is finished or closed.
+    """
+    global _json_mode_streaming
+    cache, key, cached = _cache_lookup(system, prompt, temperature, max_tokens, use_cache)
+    if cached is not None:
+        yield cached
+        return
+    
+    ratio = get_token_ratio()
+    budget = WordBudget(target_words) if target_words else None
+    api_max_tokens = ratio.max_tokens_for(target_words, ceiling=max_tokens) if budget else max_tokens
+    
+    request = dict(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=temperature,
+        max_tokens=api_max_tokens,
+        stream=True,
+    )
+    
+    prompt_tokens = estimate_prompt_tokens(system, prompt)
+    parts, raw, usage = [], [], None
+    
+    with get_groq_scheduler().slot(priority, prompt_tokens + api_max_tokens) as lease:
+        if json_mode and _json_mode_streaming:
+            try:
+                stream = get_client().chat.completions.create(response_format=JSON_MODE, **request)
+            except Exception as e:
+                if getattr(e, "status_code", None) != 400:
+                    raise
+                print(f"⚠️  JSON mode refused for streaming ({e}) - relying on local repair")
+                _json_mode_streaming = False
+                stream = get_client().chat.completions.create(**request)
+        else:
+            stream = get_client().chat.completions.create(**request)
+        
+        try:
+            for chunk in stream:
+                usage = _stream_usage(chunk) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                raw.append(delta)
+                if budget:
+                    delta = budget.feed(delta)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+                if budget and budget.done:
+                    print(f"✂️  Stopped at {count_words(''.join(parts))} words (target {target_words})")
+                    break
+            else:
+                tail = budget.finish() if budget else ""
+                if tail:
+                    parts.append(tail)
+                    yield tail
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            lease.record_usage(usage if usage is not None else prompt_tokens + len(raw))
+    
+    # Only prose feeds the words-per-token estimate - JSON keys, braces and
+    # quotes would skew it. Stream chunks are ~1 token each; use the exact
+    # count when the stream ran to the end.
+    if budget:
+        tokens = usage.completion_tokens if usage is not None else len(raw)
+        ratio.record(count_words("".join(raw)), tokens)
+    
+    if key:
+        cache.put(key, "".join(parts).strip())
+
+def _generate_story(request: dict) -> str:
+    """Run a story request built by one of the _*_story_request helpers"""
+    try:
+        story = "".join(_chat_completion_stream(request["system"], request["prompt"],
+                                                temperature=request["temperature"],
+                                                max_tokens=request["max_tokens"],
+                                                target_words=request["target_words"])).strip()
+        print(f"📊 Generated: {count_words(story)} words{request['label']}")
+        return story
+        
+    except Exception as e:
+        return f"Error generating story: {str(e)}"
+
+def _stream_story(request: dict):
+    """Yield story text chunks as they arrive"""
+    parts = []
+    try:
+        for chunk in _chat_completion_stream(request["system"], request["prompt"],
+                                             temperature=request["temperature"],
+                                             max_tokens=request["max_tokens"],
+                                             target_words=request["target_words"]):
+            parts.append(chunk)
+            yield chunk
+        print(f"📊 Streamed: {count_words(''.join(parts))} words{request['label']}")
+        
+    except Exception as e:
+        yield f"Error generating story: {str(e)}"
+
+def _emotion_story_request(emotion: str, user_idea: Optional[str] = None, 
+                           length: str = "medium", custom_words: int = None, 
+                           custom_paragraphs: int = None) -> dict:
+    """Build the emotion-based story request"""
     
     if length == "custom" and custom_words:
         target = custom_words
@@ -62,31 +282,30 @@ Write EXACTLY {target} words."""
 EXACTLY {target} words.
 Focus on {emotion}."""
 
-    try:
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=target * 2,
-        )
-        
-        story = completion.choices[0].message.content.strip()
-        print(f"📊 Generated: {count_words(story)} words")
-        return story
-        
-    except Exception as e:
-        return f"Error generating story: {str(e)}"
+    return {"system": system, "prompt": prompt, "temperature": 0.7,
+            "max_tokens": target * 2, "target_words": target, "label": ""}
 
-def generate_ancestral_story(
+def generate_emotion_story(emotion: str, user_idea: Optional[str] = None, 
+                          length: str = "medium", custom_words: int = None, 
+                          custom_paragraphs: int = None) -> str:
+    """Generate emotion-based story"""
+    return _generate_story(_emotion_story_request(emotion, user_idea, length,
+                                                  custom_words, custom_paragraphs))
+
+def stream_emotion_story(emotion: str, user_idea: Optional[str] = None, 
+                         length: str = "medium", custom_words: int = None, 
+                         custom_paragraphs: int = None):
+    """Generate emotion-based story - yields text chunks as they arrive"""
+    return _stream_story(_emotion_story_request(emotion, user_idea, length,
+                                                custom_words, custom_paragraphs))
+
+def _ancestral_story_request(
     your_name: str, father_name: str, mother_name: str,
     grandfather_name: str = "", grandmother_name: str = "",
     siblings: str = "", extra_idea: str = None,
     length: str = "medium", custom_words: int = None, custom_paragraphs: int = None
-) -> str:
-    """Generate ancestral story"""
+) -> dict:
+    """Build the ancestral story request"""
     
     if length == "custom" and custom_words:
         target = custom_words
@@ -124,31 +343,48 @@ REQUIREMENTS:
 
 Write EXACTLY {target} words."""
 
-    try:
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": f"Write EXACTLY {target} words."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.6,
-            max_tokens=target * 2,
-        )
-        
-        story = completion.choices[0].message.content.strip()
-        print(f"📊 Generated: {count_words(story)} words (ANCESTRAL)")
-        return story
-        
-    except Exception as e:
-        return f"Error generating story: {str(e)}"
+    return {"system": f"Write EXACTLY {target} words.", "prompt": prompt, "temperature": 0.6,
+            "max_tokens": target * 2, "target_words": target, "label": " (ANCESTRAL)"}
+
+def generate_ancestral_story(
+    your_name: str, father_name: str, mother_name: str,
+    grandfather_name: str = "", grandmother_name: str = "",
+    siblings: str = "", extra_idea: str = None,
+    length: str = "medium", custom_words: int = None, custom_paragraphs: int = None
+) -> str:
+    """Generate ancestral story"""
+    return _generate_story(_ancestral_story_request(
+        your_name, father_name, mother_name, grandfather_name, grandmother_name,
+        siblings, extra_idea, length, custom_words, custom_paragraphs))
+
+def stream_ancestral_story(
+    your_name: str, father_name: str, mother_name: str,
+    grandfather_name: str = "", grandmother_name: str = "",
+    siblings: str = "", extra_idea: str = None,
+    length: str = "medium", custom_words: int = None, custom_paragraphs: int = None
+):
+    """Generate ancestral story - yields text chunks as they arrive"""
+    return _stream_story(_ancestral_story_request(
+        your_name, father_name, mother_name, grandfather_name, grandmother_name,
+        siblings, extra_idea, length, custom_words, custom_paragraphs))
 
 def generate_mythology_dialogue(
     previous_context: Optional[str] = None,
     user_answer: Optional[str] = None,
     correct_answer: Optional[str] = None,
-    scenario: Optional[dict] = None
+    scenario: Optional[dict] = None,
+    memory: Optional[DialogueMemory] = None,
+    on_segment=None,
+    priority: int = PRIORITY_INTERACTIVE
 ) -> dict:
-    """Interactive friendly dialogue - Like talking with a wise friend"""
+    """
+    Interactive friendly dialogue - Like talking with a wise friend.
+    memory: bounded history of earlier turns; replaces the model's own
+    running "context" summary when given
+    on_segment: callback(segment_so_far) - streams the reply and calls this
+    as the "segment" field grows, before the rest of the JSON has arrived
+    priority: scheduler class - the warm pool pre-generates openings as batch work
+    """
     
     try:
         if scenario is None:
@@ -183,6 +419,9 @@ You MUST respond ONLY with valid JSON in this exact format:
 IMPORTANT: Write "{wise} speaks:" not "Arjuna speaks" or any other name."""
         else:
             # Continuing dialogue - Help with their problem
+            if memory is not None and memory.total_turns:
+                previous_context = memory.render()
+            
             prompt = f"""Continue as {wise}, helping your friend with their problem.
 
 Previous context: {previous_context}
@@ -208,23 +447,29 @@ You MUST respond ONLY with valid JSON:
 
 IMPORTANT: Always write "{wise} speaks:" at the start."""
 
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": f"You are {wise}, a wise and caring friend helping someone with life problems. Respond ONLY with valid JSON. Use '{wise} speaks:' format."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8,
-            max_tokens=600
-        )
-        
-        text = completion.choices[0].message.content.strip()
+        system = f"You are {wise}, a wise and caring friend helping someone with life problems. Respond ONLY with valid JSON. Use '{wise} speaks:' format."
         
-        # Clean JSON formatting
-        text = text.replace('```json', '').replace('```', '').strip()
+        # Conversations stay fresh - dialogue turns are never served from cache
+        if on_segment is None:
+            text = _chat_completion(system, prompt, temperature=0.8, max_tokens=600,
+                                    use_cache=False, json_mode=True,
+                                    priority=priority)
+        else:
+            parser = PartialJSONParser()
+            shown = None
+            for chunk in _chat_completion_stream(system, prompt, temperature=0.8, max_tokens=600,
+                                                 use_cache=False, json_mode=True,
+                                                 priority=priority):
+                parser.feed(chunk)
+                segment = parser.string_field("segment")
+                if segment and segment != shown:
+                    on_segment(segment)
+                    shown = segment
+            text = parser.text
         
-        # Parse JSON
-        result = json.loads(text)
+        # Parse JSON - fences, stray text and truncation are repaired locally
+        result = repair_json(text)
+        result = {k: v for k, v in result.items() if v is not None}
         
         # CRITICAL FIX: Ensure 'segment' always exists and has correct format
         if "segment" not in result:
@@ -271,10 +516,10 @@ IMPORTANT: Always write "{wise} speaks:" at the start."""
             "error": str(e)
         }
 
-def generate_cultural_story(topic: str, user_idea: str = None,
-                           length: str = "medium", custom_words: int = None,
-                           custom_paragraphs: int = None) -> str:
-    """Generate cultural/historical story"""
+def _cultural_story_request(topic: str, user_idea: str = None,
+                            length: str = "medium", custom_words: int = None,
+                            custom_paragraphs: int = None) -> dict:
+    """Build the cultural/historical story request"""
     
     if length == "custom" and custom_words:
         target = custom_words
@@ -302,20 +547,122 @@ REQUIREMENTS:
 
 Write EXACTLY {target} words."""
 
-    try:
-        completion = client.chat.completions.create(
+    return {"system": f"Write cultural stories. EXACTLY {target} words.", "prompt": prompt,
+            "temperature": 0.5, "max_tokens": target * 2, "target_words": target,
+            "label": " (Cultural)"}
+
+def generate_cultural_story(topic: str, user_idea: str = None,
+                           length: str = "medium", custom_words: int = None,
+                           custom_paragraphs: int = None) -> str:
+    """Generate cultural/historical story"""
+    return _generate_story(_cultural_story_request(topic, user_idea, length,
+                                                   custom_words, custom_paragraphs))
+
+def stream_cultural_story(topic: str, user_idea: str = None,
+                          length: str = "medium", custom_words: int = None,
+                          custom_paragraphs: int = None):
+    """Generate cultural/historical story - yields text chunks as they arrive"""
+    return _stream_story(_cultural_story_request(topic, user_idea, length,
+                                                 custom_words, custom_paragraphs))
+
+# ---------------------------------------------------------------------------
+# Async / batched API
+# ---------------------------------------------------------------------------
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+STORY_REQUEST_BUILDERS = {
+    "emotion": _emotion_story_request,
+    "ancestral": _ancestral_story_request,
+    "cultural": _cultural_story_request,
+}
+
+async def _async_chat_completion(system: str, prompt: str, temperature: float, max_tokens: int,
+                                 use_cache: bool = True, target_words: int = None,
+                                 priority: int = PRIORITY_BATCH) -> str:
+    """
+    Async twin of _chat_completion - same cache, AsyncGroq client.
+    target_words sizes max_tokens and trims the result like the streaming path.
+    """
+    cache, key, cached = _cache_lookup(system, prompt, temperature, max_tokens, use_cache)
+    if cached is not None:
+        return cached
+    
+    ratio = get_token_ratio()
+    api_max_tokens = ratio.max_tokens_for(target_words, ceiling=max_tokens) if target_words else max_tokens
+    
+    estimate = estimate_prompt_tokens(system, prompt) + api_max_tokens
+    async with get_groq_scheduler().async_slot(priority, estimate) as lease:
+        completion = await get_async_client().chat.completions.create(
             model=MODEL,
             messages=[
-                {"role": "system", "content": f"Write cultural stories. EXACTLY {target} words."},
+                {"role": "system", "content": system},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.5,
-            max_tokens=target * 2,
+            temperature=temperature,
+            max_tokens=api_max_tokens
         )
-        
-        story = completion.choices[0].message.content.strip()
-        print(f"📊 Generated: {count_words(story)} words (Cultural)")
-        return story
-        
-    except Exception as e:
-        return f"Error generating story: {str(e)}"
\ No newline at end of file
+        lease.record_usage(getattr(completion, "usage", None))
+    
+    text = completion.choices[0].message.content.strip()
+    usage = getattr(completion, "usage", None)
+    if usage is not None and target_words:
+        ratio.record(count_words(text), usage.completion_tokens)
+    if target_words:
+        text = trim_to_budget(text, target_words)
+    
+    if key:
+        cache.put(key, text)
+    return text
+
+async def agenerate_story(spec: dict) -> str:
+    """
+    spec: {"kind": "emotion" | "ancestral" | "cultural", **arguments of the
+    matching generate_*_story function}. Raises on failure instead of
+    returning an error string, so batch callers can tell the two apart.
+    """
+    spec = dict(spec)
+    kind = spec.pop("kind", None)
+    if kind not in STORY_REQUEST_BUILDERS:
+        raise ValueError(f"Unknown story kind: {kind!r}")
+    
+    request = STORY_REQUEST_BUILDERS[kind](**spec)
+    story = await _async_chat_completion(request["system"], request["prompt"],
+                                         temperature=request["temperature"],
+                                         max_tokens=request["max_tokens"],
+                                         target_words=request["target_words"])
+    print(f"📊 Generated: {count_words(story)} words{request['label']}")
+    return story
+
+async def generate_many(specs: List[dict],
+                        max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[dict]:
+    """
+    Generate a batch of stories with at most max_concurrency requests in flight.
+    Results come back in the order of specs, one dict per item:
+      {"ok": True, "story": "..."} or {"ok": False, "error": "..."}
+    One failing item never cancels the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def run_one(spec: dict) -> dict:
+        async with semaphore:
+            try:
+                return {"ok": True, "story": await agenerate_story(spec)}
+            except Exception as e:
+                return {"ok": False, "error": f"Error generating story: {str(e)}"}
+    
+    results = await asyncio.gather(*(run_one(spec) for spec in specs))
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"✅ Batch done: {len(results) - failed}/{len(results)} stories")
+    return list(results)
+
+def generate_many_sync(specs: List[dict],
+                       max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[dict]:
+    """generate_many for callers without an event loop (scripts, batch jobs)"""
+    async def run() -> List[dict]:
+        try:
+            return await generate_many(specs, max_concurrency)
+        finally:
+            await close_async_client()
+    
+    return asyncio.run(run())
\ No newline at end of file
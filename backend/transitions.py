@@ -0,0 +1,89 @@
+# backend/transitions.py
+# Scene transitions. Wipes and dissolves share one fixed-point kernel: both
+# images are converted once per transition, then every frame is integer NumPy
+# arithmetic into a reused buffer - out = a + ((b - a) * w + 64) >> 7
+#
+# Images are handled as (h, w * 3) rows, so per-pixel weights are repeated per
+# channel and broadcast along contiguous memory (a trailing size-3 axis would
+# defeat NumPy's SIMD loops and run ~3x slower)
+
+import cv2
+import numpy as np
+
+WEIGHT_ONE = 128        # fixed-point 1.0 - (b - a) * 128 still fits in int16
+WEIGHT_SHIFT = 7
+
+# Masked transitions give every pixel a start time in 0..FIELD_MAX. A pixel
+# then blends over WEIGHT_ONE steps, so its soft edge is 1/8 of the sweep.
+FIELD_MAX = 1024
+
+TRANSITIONS = ("crossfade", "wipe_right", "wipe_left", "dissolve")
+DEFAULT_TRANSITION = "crossfade"
+
+
+class FixedPointBlend:
+    """Blends img1 towards img2 into caller-supplied uint8 buffers"""
+
+    def __init__(self, img1: np.ndarray, img2: np.ndarray):
+        rows = img1.shape[0]
+        self.base = img1.reshape(rows, -1).astype(np.int16)
+        self.delta = img2.reshape(rows, -1).astype(np.int16)
+        self.delta -= self.base
+        self.scratch = np.empty_like(self.base)
+
+    def blend(self, weight, dst: np.ndarray) -> np.ndarray:
+        """weight: int in 0..WEIGHT_ONE, or an int16 map broadcastable to (h, w * 3)"""
+        s = self.scratch
+        np.multiply(self.delta, weight, out=s)
+        s += WEIGHT_ONE // 2
+        s >>= WEIGHT_SHIFT
+        s += self.base
+        np.copyto(dst.reshape(s.shape), s, casting="unsafe")
+        return dst
+
+
+class Transition:
+    def __init__(self, kind: str = DEFAULT_TRANSITION, seed: int = 0):
+        """kind: one of TRANSITIONS; seed fixes the dissolve pattern"""
+        if kind not in TRANSITIONS:
+            raise ValueError(f"Unknown transition {kind!r}, expected one of {TRANSITIONS}")
+        self.kind = kind
+        self.seed = seed
+        self._fields = {}
+
+    def field(self, height: int, width: int, channels: int = 3) -> np.ndarray:
+        """Per-pixel start time (int16, broadcastable to (h, w * channels)), cached per size"""
+        key = (height, width, channels)
+        if key not in self._fields:
+            if self.kind == "dissolve":
+                rng = np.random.default_rng(self.seed)
+                field = rng.integers(0, FIELD_MAX + 1, (height, width), dtype=np.int16)
+            else:
+                field = np.rint(np.linspace(0, FIELD_MAX, width)).astype(np.int16)[None, :]
+                if self.kind == "wipe_left":
+                    field = field[:, ::-1]
+            self._fields[key] = np.repeat(field, channels, axis=1)
+        return self._fields[key]
+
+    def levels(self, frames: int) -> np.ndarray:
+        """Sweep position per frame, from the first pixel starting to the last finishing"""
+        t = np.arange(frames, dtype=np.float64) / max(1, frames)
+        return np.rint(t * (FIELD_MAX + WEIGHT_ONE)).astype(np.int16)
+
+    def render(self, img1: np.ndarray, img2: np.ndarray, frames: int, ring):
+        """Yield frames; each is written into ring.next(...) and reused later"""
+        if self.kind == "crossfade":
+            # One uniform weight per frame - OpenCV's SIMD addWeighted beats the
+            # NumPy kernel here, so it only serves the per-pixel transitions
+            for i in range(frames):
+                alpha = i / frames
+                yield cv2.addWeighted(img1, 1 - alpha, img2, alpha, 0, dst=ring.next(img1.shape))
+            return
+
+        kernel = FixedPointBlend(img1, img2)
+        field = self.field(*img1.shape)
+        mask = np.empty_like(field)
+        for level in self.levels(frames).tolist():
+            np.subtract(level, field, out=mask)
+            np.clip(mask, 0, WEIGHT_ONE, out=mask)
+            yield kernel.blend(mask, ring.next(img1.shape))
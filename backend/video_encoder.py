@@ -0,0 +1,96 @@
+# backend/video_encoder.py
+# Single-pass encoding - raw BGR frames go over stdin to one ffmpeg process,
+# which also reads the narration MP3 and writes the final H.264/AAC mp4.
+# Before this, cv2.VideoWriter wrote an mp4 that a second ffmpeg run decoded
+# and re-encoded just to add the audio.
+
+import shutil
+import subprocess
+import tempfile
+from typing import Optional
+
+FFMPEG = "ffmpeg"
+FINISH_TIMEOUT = 180      # seconds ffmpeg gets to flush after the last frame
+
+# Same output settings merge_audio has always used
+VIDEO_ARGS = ['-c:v', 'libx264', '-preset', 'fast', '-crf', '22', '-pix_fmt', 'yuv420p']
+AUDIO_ARGS = ['-c:a', 'aac', '-b:a', '192k']
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG) is not None
+
+
+class FFmpegPipeEncoder:
+    """
+    Same write / release / isOpened shape as cv2.VideoWriter. Frames must be
+    uint8 BGR arrays of the given size. With audio_path the narration is
+    muxed in and the video is cut to its length (-shortest), as merge_audio did.
+    """
+
+    def __init__(self, path, size: tuple, fps: int, audio_path: Optional[str] = None,
+                 threads: Optional[int] = None):
+        """threads caps libx264's threads, e.g. when several encoders run at once"""
+        width, height = size
+        cmd = [
+            FFMPEG, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}', '-r', str(fps),
+            '-i', '-',
+        ]
+        if audio_path:
+            cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+        cmd += VIDEO_ARGS
+        if threads:
+            cmd += ['-threads', str(threads)]
+        if audio_path:
+            cmd += AUDIO_ARGS + ['-shortest']
+        cmd += ['-movflags', '+faststart', '-f', 'mp4', str(path)]
+
+        self.path = str(path)
+        self.frame_bytes = width * height * 3
+        self.frames = 0
+        self.stopped = False
+        # stderr goes to a file - an unread pipe could fill up and stall ffmpeg
+        self.errors = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                     stdout=subprocess.DEVNULL, stderr=self.errors)
+
+    def isOpened(self) -> bool:
+        return self.proc.poll() is None
+
+    def write(self, frame):
+        """
+        Frames after ffmpeg has stopped reading are dropped - with audio that
+        is -shortest ending the video with the narration. Whether it stopped
+        cleanly or crashed is reported by release().
+        """
+        if frame.nbytes != self.frame_bytes:
+            raise ValueError(f"Frame is {frame.nbytes} bytes, expected {self.frame_bytes}")
+        if self.stopped:
+            return
+        try:
+            self.proc.stdin.write(frame.data if frame.flags.c_contiguous else frame.tobytes())
+            self.frames += 1
+        except BrokenPipeError:
+            self.stopped = True
+
+    def release(self) -> bool:
+        """Close stdin and wait for the file; True if ffmpeg finished cleanly"""
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            code = self.proc.wait(timeout=FINISH_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+            code = None
+
+        if code != 0:
+            self.errors.seek(0)
+            error = self.errors.read().decode(errors="replace").strip() or f"exit code {code}"
+            print(f"   ❌ FFmpeg failed: {error}")
+        self.errors.close()
+        return code == 0
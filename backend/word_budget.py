@@ -0,0 +1,168 @@
+# backend/word_budget.py
+# Length control for generated stories - stop the stream at a sentence
+# boundary near the target and size max_tokens from measured words/token
+
+import math
+import re
+import threading
+
+# Typical for English prose with the Llama tokenizer; replaced by measurements
+DEFAULT_WORDS_PER_TOKEN = 0.75
+
+# A sentence ends at . ! ? (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r"[.!?][\"'”’)\]]*(?=\s)")
+WORD = re.compile(r"\S+")
+
+
+def _word_offset(text: str, n: int) -> int:
+    """Character offset just after the n-th word of text"""
+    end = 0
+    for i, match in enumerate(WORD.finditer(text)):
+        if i >= n:
+            break
+        end = match.end()
+    return end
+
+
+class WordBudget:
+    """
+    Feed streamed text in, get back the part that is safe to show.
+
+    Below hold_ratio * target everything is released as it arrives. After
+    that only complete sentences are released. Sentence ends between
+    min_ratio * target and max_ratio * target are candidates: the newest one
+    is held back until the next one turns out farther from the target (or
+    past the cap), and the stream is finished at whichever is closest. If no
+    sentence ends in range, it is cut at the last one seen (or, for one very
+    long sentence, hard at the cap).
+    """
+
+    def __init__(self, target_words: int, min_ratio: float = 0.9,
+                 max_ratio: float = 1.15, hold_ratio: float = 0.75):
+        self.target_words = target_words
+        self.min_words = max(1, int(target_words * min_ratio))
+        self.max_words = max(self.min_words, int(math.ceil(target_words * max_ratio)))
+        self.hold_words = int(target_words * hold_ratio)
+        self.emitted = ""
+        self.pending = ""
+        self.done = False
+
+    def _words(self, pending_upto: int = None) -> int:
+        tail = self.pending if pending_upto is None else self.pending[:pending_upto]
+        return len((self.emitted + tail).split())
+
+    def _emit(self, cut: int) -> str:
+        out, self.pending = self.pending[:cut], self.pending[cut:]
+        self.emitted += out
+        return out
+
+    def feed(self, delta: str) -> str:
+        if self.done:
+            return ""
+        self.pending += delta
+
+        total = self._words()
+        if total < self.hold_words:
+            return self._emit(len(self.pending))
+
+        cut = None          # sentences that are definitely in
+        candidate = None    # closest stopping point so far, held back
+        candidate_words = 0
+        for match in SENTENCE_END.finditer(self.pending):
+            end = match.end()
+            words = self._words(end)
+            if words > self.max_words:
+                break
+            if words < self.min_words:
+                cut = end
+                continue
+            if candidate is not None and \
+                    abs(words - self.target_words) >= abs(candidate_words - self.target_words):
+                # Moving away from the target - the held sentence end was closest
+                break
+            if candidate is not None:
+                cut = candidate
+            candidate, candidate_words = end, words
+            if words >= self.target_words:
+                break   # every later sentence end is farther still
+        else:
+            if candidate is not None and total < self.max_words:
+                # The next sentence end may still land closer - keep waiting
+                return self._emit(cut) if cut is not None else ""
+
+        if candidate is not None:
+            self.done = True
+            return self._emit(candidate)
+
+        if total >= self.max_words:
+            self.done = True
+            if cut is None:
+                cut = _word_offset(self.pending, self.max_words - len(self.emitted.split()))
+            return self._emit(cut)
+
+        # Release finished sentences, hold back the one still being written
+        return self._emit(cut) if cut is not None else ""
+
+    def finish(self) -> str:
+        """Stream ended on its own - release whatever is left"""
+        if self.done:
+            return ""
+        self.done = True
+        return self._emit(len(self.pending))
+
+    @property
+    def text(self) -> str:
+        return self.emitted.strip()
+
+
+def trim_to_budget(text: str, target_words: int, **ratios) -> str:
+    """Apply the same stopping rule to an already complete text"""
+    budget = WordBudget(target_words, **ratios)
+    budget.feed(text)
+    budget.finish()
+    return budget.text
+
+
+class TokenRatio:
+    """Running words-per-token estimate, used to size max_tokens"""
+
+    def __init__(self, initial: float = DEFAULT_WORDS_PER_TOKEN, smoothing: float = 0.2):
+        self.words_per_token = initial
+        self.smoothing = smoothing
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    def record(self, words: int, tokens: int):
+        if words <= 0 or tokens <= 0:
+            return
+        ratio = words / tokens
+        with self.lock:
+            if self.samples == 0:
+                self.words_per_token = ratio
+            else:
+                self.words_per_token += self.smoothing * (ratio - self.words_per_token)
+            self.samples += 1
+
+    def max_tokens_for(self, target_words: int, max_ratio: float = 1.15,
+                       margin: int = 32, ceiling: int = None) -> int:
+        """Enough tokens to reach the hard word cap, plus a small margin"""
+        with self.lock:
+            ratio = self.words_per_token
+        tokens = int(math.ceil(target_words * max_ratio / ratio)) + margin
+        return min(tokens, ceiling) if ceiling else tokens
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"words_per_token": round(self.words_per_token, 3), "samples": self.samples}
+
+
+_default_ratio = None
+_default_ratio_lock = threading.Lock()
+
+def get_token_ratio() -> TokenRatio:
+    """Process-wide estimate, shared by every story request"""
+    global _default_ratio
+    with _default_ratio_lock:
+        if _default_ratio is None:
+            _default_ratio = TokenRatio()
+        return _default_ratio
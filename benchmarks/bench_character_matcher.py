@@ -0,0 +1,88 @@
+# benchmarks/bench_character_matcher.py
+# Legacy per-pattern substring search vs the compiled single-pass matcher
+#
+# Run from the project root:
+#   python benchmarks/bench_character_matcher.py
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.character_matcher import (
+    CHARACTER_DESCRIPTIONS,
+    DEFAULT_CATALOG,
+    FEMALE_PATTERNS,
+    MALE_PATTERNS,
+)
+
+FILLER = ("the village was quiet as the sun rose over the river and the people "
+          "gathered near the temple to listen to old stories of courage and love "
+          "while children played in the fields and a program about reason began").split()
+
+NAMES = ["Krishna", "Arjuna", "Sita", "Hanuman", "mother", "grandfather", "Radha", "king"]
+
+
+def legacy_find(text: str) -> list:
+    """
+    Old behaviour - tables rebuilt on every call, then a substring search
+    for every pattern of every character
+    """
+    found = []
+    tables = ({k: list(v) for k, v in MALE_PATTERNS.items()},
+              {k: list(v) for k, v in FEMALE_PATTERNS.items()})
+    for patterns in tables:
+        for name, options in patterns.items():
+            for pattern in options:
+                if pattern in text:
+                    dict(CHARACTER_DESCRIPTIONS).get(name)
+                    found.append(name)
+                    break
+    return found
+
+
+def make_story(words: int, rng: random.Random) -> str:
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(NAMES) if rng.random() < 0.02 else rng.choice(FILLER))
+    return " ".join(out).lower()
+
+
+def timeit(fn, texts, repeat=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    cases = [
+        ("1 story x 300 words", [make_story(300, rng)]),
+        ("1 story x 20,000 words", [make_story(20000, rng)]),
+        ("1,000 stories x 300 words", [make_story(300, rng) for _ in range(1000)]),
+    ]
+
+    print(f"\n{'='*60}")
+    print("📊 CHARACTER MATCHING")
+    print(f"{'='*60}")
+    for label, texts in cases:
+        legacy = timeit(legacy_find, texts)
+        compiled = timeit(DEFAULT_CATALOG.find, texts)
+        print(f"   {label:<28} legacy {legacy * 1000:8.2f} ms | compiled {compiled * 1000:8.2f} ms "
+              f"| {legacy / compiled:5.2f}x")
+
+    sample = "a program about reason"
+    print(f"\n   False hits in '{sample}':")
+    print(f"     legacy:   {legacy_find(sample)}")
+    print(f"     compiled: {[c['name'] for c in DEFAULT_CATALOG.find(sample)]}")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_dialogue_memory.py
+# Prompt context size per turn: full history vs bounded DialogueMemory
+#
+# Run from the project root:
+#   python benchmarks/bench_dialogue_memory.py --turns 60
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.dialogue_memory import DialogueMemory, USER_SPEAKER, estimate_tokens
+
+WORDS = ("dharma duty family worry career choice courage patience friend heart "
+         "mind path truth fear hope brother mother work decision peace").split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def fake_turn(rng: random.Random, words: int) -> str:
+    return " ".join(sentence(rng, 12) for _ in range(max(1, words // 12)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=60, help="exchanges (user + reply)")
+    parser.add_argument("--recent", type=int, default=6)
+    parser.add_argument("--summary-tokens", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    memory = DialogueMemory(args.recent, args.summary_tokens)
+    history = []
+    rows = []
+
+    for turn in range(1, args.turns + 1):
+        start = time.perf_counter()
+        bounded = memory.render()
+        bounded_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        full = "\n".join(history)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        rows.append((turn, estimate_tokens(full), full_ms, estimate_tokens(bounded), bounded_ms))
+
+        user, reply = fake_turn(rng, 30), fake_turn(rng, 90)
+        for speaker, text in ((USER_SPEAKER, user), ("Krishna", reply)):
+            memory.add(speaker, text)
+            history.append(f"{speaker}: {text}")
+
+    checkpoints = {1, 5, 10, 25, 50, args.turns}
+    print(f"\n{'='*64}")
+    print(f"📊 Prompt context per turn ({args.recent} verbatim turns, "
+          f"{args.summary_tokens}-token summary)")
+    print(f"   {'turn':>5} | {'full history':>14} | {'bounded memory':>16}")
+    for turn, full_tokens, full_ms, mem_tokens, mem_ms in rows:
+        if turn in checkpoints:
+            print(f"   {turn:>5} | {full_tokens:>7} tokens | {mem_tokens:>9} tokens"
+                  f"   ({full_ms:.3f} / {mem_ms:.3f} ms)")
+    peak = max(r[3] for r in rows)
+    print(f"   Peak bounded context: {peak} tokens vs {rows[-1][1]} for full history")
+    print(f"   Memory: {memory.stats()}")
+    print(f"{'='*64}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_encode.py
+# Two-pass (cv2.VideoWriter, then ffmpeg re-encodes to add audio) vs
+# single-pass (raw frames piped into one ffmpeg that muxes the audio)
+#
+# Needs ffmpeg on PATH. Run from the project root:
+#   python benchmarks/bench_encode.py --seconds 20
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+
+from backend.ken_burns import KenBurns
+from backend.scene_generator import FrameRing
+from backend.video_encoder import FFMPEG, FFmpegPipeEncoder, ffmpeg_available
+
+SIZE = (1280, 720)
+FPS = 30
+
+
+def make_frames(count: int):
+    """Ken Burns over a blurred-noise picture, close to what render_video sends"""
+    w, h = SIZE
+    noise = np.random.default_rng(0).integers(0, 256, (h, w, 3), dtype=np.uint8)
+    img = cv2.GaussianBlur(noise, (0, 0), 6)
+    return KenBurns().render(img, count, FrameRing())
+
+
+def make_audio(folder: str, seconds: float) -> str:
+    path = os.path.join(folder, "narration.mp3")
+    subprocess.run([FFMPEG, '-y', '-loglevel', 'error', '-f', 'lavfi',
+                    '-i', f'sine=frequency=440:duration={seconds}', path], check=True)
+    return path
+
+
+def two_pass(folder: str, frames: int, audio: str) -> tuple:
+    """What render_video + merge_audio did before"""
+    video = os.path.join(folder, "two_pass.mp4")
+    muxed = os.path.join(folder, "two_pass_with_audio.mp4")
+    start = time.perf_counter()
+    # render_video asks for avc1 first; OpenCV builds without an H.264
+    # encoder end up on mp4v, which makes this first pass much cheaper
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'avc1'), FPS, SIZE, isColor=True)
+    if not writer.isOpened():
+        writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'mp4v'), FPS, SIZE, isColor=True)
+    for frame in make_frames(frames):
+        writer.write(frame)
+    writer.release()
+    print(f"   first pass (OpenCV): {time.perf_counter() - start:.2f}s")
+    intermediate = os.path.getsize(video)
+    subprocess.run([FFMPEG, '-y', '-loglevel', 'error', '-i', video, '-i', audio,
+                    '-c:v', 'libx264', '-preset', 'fast', '-crf', '22',
+                    '-c:a', 'aac', '-b:a', '192k', '-shortest',
+                    '-movflags', '+faststart', muxed], check=True)
+    os.replace(muxed, video)
+    return intermediate + os.path.getsize(video), 2
+
+
+def single_pass(folder: str, frames: int, audio: str) -> tuple:
+    video = os.path.join(folder, "single_pass.mp4")
+    encoder = FFmpegPipeEncoder(video, SIZE, FPS, audio_path=audio)
+    for frame in make_frames(frames):
+        encoder.write(frame)
+    assert encoder.release()
+    return os.path.getsize(video), 1
+
+
+def run(fn, folder, frames, audio):
+    start = time.perf_counter()
+    written, encodes = fn(folder, frames, audio)
+    return time.perf_counter() - start, written, encodes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+
+    if not ffmpeg_available():
+        sys.exit("ffmpeg not found on PATH")
+
+    folder = tempfile.mkdtemp()
+    frames = int(args.seconds * FPS)
+    audio = make_audio(folder, args.seconds)
+
+    old = run(two_pass, folder, frames, audio)
+    new = run(single_pass, folder, frames, audio)
+
+    print(f"\n{'='*56}")
+    print(f"📊 Encoding {args.seconds:.0f}s at {SIZE[0]}x{SIZE[1]} {FPS}fps with narration")
+    print(f"   {'':<12} {'time':>8} {'written':>10} {'encodes':>8}")
+    for name, (secs, written, encodes) in (("two-pass", old), ("single-pass", new)):
+        print(f"   {name:<12} {secs:7.2f}s {written / 2**20:8.2f}MB {encodes:>8}")
+    print(f"   Speed-up: {old[0] / new[0]:.2f}x")
+    print(f"{'='*56}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_image_fetch.py
+# Serial vs concurrent image fetching with a simulated backend latency
+#
+# Run from the project root:
+#   python benchmarks/bench_image_fetch.py --images 10 --latency 3
+#   python benchmarks/bench_image_fetch.py --local-server   # real HTTP against the stand-in
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.artifact_store import ArtifactStore
+from backend.image_backend import HTTPImageBackend, ImageBackend
+from backend.image_cache import ImageCache
+from backend.images_generator import ImageGenerator
+from backend.local_image_server import LocalImageServer
+
+
+class FakeLatencyBackend(ImageBackend):
+    """Backend whose network call is replaced by a fixed sleep"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def fetch(self, prompt: str, seed: int, width: int, height: int, model: str,
+              timeout: float = None) -> bytes:
+        time.sleep(self.latency)
+        return prompt.encode()
+
+
+def run(concurrent: bool, backend: ImageBackend, args) -> float:
+    gen = ImageGenerator(
+        max_in_flight=args.in_flight,
+        requests_per_second=args.rate,
+        burst=args.burst,
+        cache=ImageCache(tempfile.mkdtemp()),
+        store=ArtifactStore(tempfile.mkdtemp()),
+        backend=backend,
+    )
+    start = time.perf_counter()
+    images = gen.generate_images_from_story("Krishna and Arjuna", args.images,
+                                            "Mahabharata", concurrent=concurrent)
+    elapsed = time.perf_counter() - start
+    assert all(img is not None for img in images), "missing images"
+    assert [img.scene_num for img in images] == list(range(1, args.images + 1)), "scene order broken"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=3.0, help="seconds per fake request")
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.5, help="requests per second")
+    parser.add_argument("--burst", type=int, default=3)
+    parser.add_argument("--local-server", action="store_true",
+                        help="fetch over HTTP from the local stand-in server")
+    args = parser.parse_args()
+
+    server = None
+    if args.local_server:
+        server = LocalImageServer(latency=args.latency)
+        backend = HTTPImageBackend(server.start())
+    else:
+        backend = FakeLatencyBackend(args.latency)
+
+    try:
+        serial = run(False, backend, args)
+        concurrent = run(True, backend, args)
+    finally:
+        if server:
+            server.stop()
+
+    legacy = args.images * args.latency + (args.images - 1) * 7
+
+    print(f"\n{'='*50}")
+    print(f"📊 {args.images} images, {args.latency:.1f}s latency each")
+    print(f"   Backend: {'local HTTP stand-in' if server else 'in-process fake'}")
+    print(f"   Legacy loop (7s sleeps): ~{legacy:.1f}s (estimated)")
+    print(f"   Serial + rate limiter:   {serial:.1f}s")
+    print(f"   Concurrent ({args.in_flight} in flight): {concurrent:.1f}s")
+    print(f"   Speedup vs serial: {serial / concurrent:.2f}x")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_import_time.py
+# Import-time budget for the backend modules the app loads on every start
+#
+# Each module is imported in a fresh interpreter with no GROQ_API_KEY set.
+# Fails (exit code 1) if an import goes over budget, needs credentials,
+# or pulls in one of the heavy libraries that should only load on first use.
+#
+# Run from the project root:
+#   python benchmarks/bench_import_time.py --budget-ms 150
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "backend.story_generator",
+    "backend.images_generator",
+    "backend.scene_generator",
+]
+
+# Must not be imported as a side effect of importing the modules above
+HEAVY_MODULES = ["cv2", "numpy", "PIL", "gtts", "groq", "httpx", "requests", "dotenv"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    __import__({module!r})
+    error = None
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "error": error, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["elapsed"] < best["elapsed"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="per-module import budget")
+    parser.add_argument("--runs", type=int, default=5, help="best of N cold imports")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"\n{'='*50}")
+    print(f"📊 Cold import times (best of {args.runs}, budget {args.budget_ms:.0f}ms)")
+    for module in MODULES:
+        result = measure(module, args.runs)
+        ms = result["elapsed"] * 1000
+        problems = []
+        if result["error"]:
+            problems.append(result["error"])
+        if result["loaded"]:
+            problems.append(f"eagerly imports {', '.join(result['loaded'])}")
+        if ms > args.budget_ms:
+            problems.append("over budget")
+
+        status = "✗" if problems else "✓"
+        print(f"   {status} {module:<28} {ms:7.1f}ms  {'; '.join(problems)}")
+        failures += bool(problems)
+    print(f"{'='*50}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_ken_burns.py
+# Ken Burns frames per second on one core: the original create_zoom (Python
+# geometry, new allocation per frame) vs the precomputed schedule
+#
+# Run from the project root:
+#   python benchmarks/bench_ken_burns.py --frames 300
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+
+from backend.ken_burns import EASINGS, PANS, KenBurns
+from backend.scene_generator import FrameRing
+
+
+def legacy_zoom(img, frames):
+    """Original create_zoom: geometry in Python, fresh resize allocation per frame"""
+    result = []
+    h, w = img.shape[:2]
+    for i in range(frames):
+        progress = i / frames
+        zoom = 1 + 0.08 * progress
+        crop_w, crop_h = int(w / zoom), int(h / zoom)
+        x = max(0, min(int((w - crop_w) * progress * 0.5), w - crop_w))
+        y = max(0, min(int((h - crop_h) * progress * 0.5), h - crop_h))
+        result.append(cv2.resize(img[y:y+crop_h, x:x+crop_w], (w, h), interpolation=cv2.INTER_LINEAR))
+    return result
+
+
+def fps(fn, frames: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return frames / best
+
+
+def timeit(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)  # per-core numbers
+    img = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    ring = FrameRing()
+
+    def drain(gen):
+        for _ in gen:
+            pass
+
+    legacy = fps(lambda: legacy_zoom(img, args.frames), args.frames, args.repeats)
+    engine = KenBurns()
+    engine_fps = fps(lambda: drain(engine.render(img, args.frames, ring)), args.frames, args.repeats)
+    smooth = KenBurns(subpixel=True)
+    smooth_fps = fps(lambda: drain(smooth.render(img, args.frames, ring)), args.frames, args.repeats)
+    sched_ms = 1000 * min(timeit(lambda: engine.crops(engine.schedule(args.frames, args.width, args.height),
+                                                      args.width, args.height))
+                          for _ in range(args.repeats))
+
+    # Same motion, so on a smooth image the output should match the original closely
+    ramp = np.linspace(0, 255, args.width, dtype=np.float32)
+    smooth_img = np.dstack([np.tile(ramp, (args.height, 1))] * 3).astype(np.uint8)
+    ref = legacy_zoom(smooth_img, 10)[7]
+    new = [f.copy() for f in engine.render(smooth_img, 10, FrameRing())][7]
+    diff = np.abs(ref.astype(np.int16) - new.astype(np.int16)).mean()
+
+    print(f"\n{'='*56}")
+    print(f"📊 Ken Burns, {args.frames} frames at {args.width}x{args.height}, 1 thread")
+    print(f"   Original create_zoom:     {legacy:7.1f} fps")
+    print(f"   Schedule + crop/resize:   {engine_fps:7.1f} fps  ({engine_fps / legacy:.2f}x)")
+    print(f"   Schedule + warpAffine:    {smooth_fps:7.1f} fps  (subpixel=True)")
+    print(f"   Schedule precompute:      {sched_ms:7.3f} ms per segment")
+    print(f"   Mean abs diff vs original (gradient, frame 7): {diff:.2f}")
+    for pan in PANS:
+        for easing in EASINGS:
+            e = KenBurns(pan=pan, easing=easing)
+            rate = fps(lambda: drain(e.render(img, 60, ring)), 60, 1)
+            print(f"   {pan:>9} / {easing:<11} {rate:7.1f} fps")
+    print(f"{'='*56}")
+
+
+if __name__ == "__main__":
+    main()
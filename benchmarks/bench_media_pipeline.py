@@ -0,0 +1,93 @@
+# benchmarks/bench_media_pipeline.py
+# Sequential vs overlapped media stages with simulated stage latencies
+#
+# Run from the project root:
+#   python benchmarks/bench_media_pipeline.py --images 6 --fetch 3 --tts 4
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.artifact_store import ArtifactStore
+from backend.image_cache import ImageCache
+from backend.images_generator import ImageGenerator
+from backend.media_pipeline import MediaPipeline
+
+from bench_image_fetch import FakeLatencyBackend
+
+
+class FakeVideo:
+    """Stands in for VideoGenerator - each stage is a sleep"""
+
+    def __init__(self, args):
+        self.args = args
+
+    def prepare_audio(self, story, sid):
+        time.sleep(self.args.tts)
+        return "narration.mp3", 30.0
+
+    def prepare_frame(self, image):
+        time.sleep(self.args.frame)
+        return image
+
+    def render_video(self, frames, sid, story=None, effects=True, audio=(None, None)):
+        time.sleep(self.args.encode)
+        return f"story_{sid}.mp4"
+
+
+def make_generator(args) -> ImageGenerator:
+    return ImageGenerator(
+        max_in_flight=args.in_flight,
+        requests_per_second=0,
+        cache=ImageCache(tempfile.mkdtemp()),
+        store=ArtifactStore(tempfile.mkdtemp()),
+        backend=FakeLatencyBackend(args.fetch),
+    )
+
+
+def sequential(args) -> float:
+    video = FakeVideo(args)
+    start = time.perf_counter()
+    images = make_generator(args).generate_images_from_story("Krishna and Arjuna", args.images, "Mahabharata")
+    frames = [video.prepare_frame(img) for img in images]
+    audio = video.prepare_audio("story", "bench")
+    video.render_video(frames, "bench", "story", True, audio)
+    return time.perf_counter() - start
+
+
+def pipelined(args) -> float:
+    start = time.perf_counter()
+    pipeline = MediaPipeline("bench", story="story", video=FakeVideo(args)).start()
+    make_generator(args).generate_images_from_story("Krishna and Arjuna", args.images, "Mahabharata",
+                                                    on_image=pipeline.add_image)
+    assert pipeline.finish() == "story_bench.mp4"
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--fetch", type=float, default=3.0, help="seconds per image fetch")
+    parser.add_argument("--frame", type=float, default=0.3, help="seconds to decode/resize one image")
+    parser.add_argument("--tts", type=float, default=4.0, help="seconds for narration + ffprobe")
+    parser.add_argument("--encode", type=float, default=2.0, help="seconds to encode the video")
+    args = parser.parse_args()
+
+    serial = sequential(args)
+    overlapped = pipelined(args)
+
+    print(f"\n{'='*50}")
+    print(f"📊 {args.images} images, fetch {args.fetch}s, TTS {args.tts}s, encode {args.encode}s")
+    print(f"   Sequential stages: {serial:.1f}s")
+    print(f"   Pipelined stages:  {overlapped:.1f}s")
+    print(f"   Saved: {serial - overlapped:.1f}s ({serial / overlapped:.2f}x)")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_segments.py
+# render_video wall time: one ffmpeg pass vs parallel segments joined by
+# stream copy, for several worker counts
+#
+# Needs ffmpeg on PATH. Run from the project root:
+#   python benchmarks/bench_segments.py --images 10 --workers 1 2 4
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+
+from backend.artifact_store import ArtifactStore
+from backend.scene_generator import VideoGenerator
+from backend.video_encoder import ffmpeg_available
+
+
+def make_images(count: int, size: tuple) -> list:
+    """Blurred noise - closer to a photo for the encoder than flat colour"""
+    w, h = size
+    rng = np.random.default_rng(0)
+    return [cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), (0, 0), 6)
+            for _ in range(count)]
+
+
+def timed_render(workers: int, images: list) -> float:
+    gen = VideoGenerator(store=ArtifactStore(tempfile.mkdtemp()), workers=workers)
+    start = time.perf_counter()
+    out = gen.render_video(images, f"bench_{workers}")
+    assert out, "render failed"
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if not ffmpeg_available():
+        sys.exit("ffmpeg not found on PATH")
+
+    from backend.scene_generator import VIDEO_SIZE
+    images = make_images(args.images, VIDEO_SIZE)
+
+    # render_video is chatty - keep its output out of the table
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for workers in args.workers:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                results[workers] = timed_render(workers, images)
+            finally:
+                sys.stdout = stdout
+
+    base = results[args.workers[0]]
+    print(f"\n{'='*56}")
+    print(f"📊 {args.images} images at 4s each, {os.cpu_count()} CPUs")
+    for workers, secs in results.items():
+        mode = "single pass" if workers == 1 else "segments"
+        print(f"   {workers:>2} worker(s) ({mode:<11}) {secs:7.2f}s  {base / secs:5.2f}x")
+    print(f"{'='*56}")
+
+
+if __name__ == "__main__":
+    main()
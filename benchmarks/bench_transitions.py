@@ -0,0 +1,73 @@
+# benchmarks/bench_transitions.py
+# Milliseconds per transition frame on one core: the original create_fade
+# (float addWeighted, new frame each time) vs backend/transitions.py
+#
+# Run from the project root:
+#   python benchmarks/bench_transitions.py --frames 12
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+
+from backend.scene_generator import FrameRing
+from backend.transitions import TRANSITIONS, WEIGHT_ONE, FixedPointBlend, Transition
+
+
+def legacy_fade(img1, img2, frames):
+    return [cv2.addWeighted(img1, 1 - i / frames, img2, i / frames, 0) for i in range(frames)]
+
+
+def ms_per_frame(fn, frames: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best / frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=12, help="frames per transition (0.4s at 30fps)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)  # per-core numbers
+    rng = np.random.default_rng(0)
+    img1 = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    img2 = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    ring = FrameRing()
+
+    def drain(gen):
+        for _ in gen:
+            pass
+
+    # The kernel must land exactly on both endpoints
+    kernel = FixedPointBlend(img1, img2)
+    out = np.empty_like(img1)
+    assert np.array_equal(kernel.blend(0, out), img1)
+    assert np.array_equal(kernel.blend(WEIGHT_ONE, out), img2)
+
+    legacy = ms_per_frame(lambda: legacy_fade(img1, img2, args.frames), args.frames, args.repeats)
+
+    print(f"\n{'='*56}")
+    print(f"📊 Transitions, {args.frames} frames at {args.width}x{args.height}, 1 thread")
+    print(f"   {'original create_fade':<22} {legacy:6.2f} ms/frame")
+    for kind in TRANSITIONS:
+        transition = Transition(kind)
+        rate = ms_per_frame(lambda: drain(transition.render(img1, img2, args.frames, ring)),
+                            args.frames, args.repeats)
+        print(f"   {kind:<22} {rate:6.2f} ms/frame  (includes per-transition setup)")
+    print(f"{'='*56}")
+
+
+if __name__ == "__main__":
+    main()
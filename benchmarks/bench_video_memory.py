@@ -0,0 +1,118 @@
+# benchmarks/bench_video_memory.py
+# Peak RSS while rendering one scene: list-building effects vs streamed frames
+#
+# Every (mode, seconds) pair runs in a fresh interpreter so peaks don't mix.
+# Run from the project root:
+#   python benchmarks/bench_video_memory.py --seconds 5 10 20
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def legacy_zoom(cv2, img, frames):
+    """create_zoom before frames were streamed - builds the whole list"""
+    result = []
+    h, w = img.shape[:2]
+    for i in range(frames):
+        progress = i / frames
+        zoom = 1 + 0.08 * progress
+        crop_w, crop_h = int(w / zoom), int(h / zoom)
+        x = max(0, min(int((w - crop_w) * progress * 0.5), w - crop_w))
+        y = max(0, min(int((h - crop_h) * progress * 0.5), h - crop_h))
+        result.append(cv2.resize(img[y:y+crop_h, x:x+crop_w], (w, h), interpolation=cv2.INTER_LINEAR))
+    return result
+
+
+def legacy_fade(cv2, img1, img2, frames):
+    return [cv2.addWeighted(img1, 1 - i / frames, img2, i / frames, 0) for i in range(frames)]
+
+
+def render(mode: str, seconds: float, encode: bool):
+    """Child process: render one scene plus a transition, report peak RSS"""
+    import resource
+
+    import numpy as np
+
+    from backend.artifact_store import ArtifactStore
+    from backend.scene_generator import VideoGenerator
+
+    gen = VideoGenerator(store=ArtifactStore(tempfile.mkdtemp()))
+    from backend.scene_generator import cv2  # loaded by the constructor
+
+    w, h = gen.size
+    rng = np.random.default_rng(0)
+    img1 = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    img2 = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    frames = int(seconds * gen.fps)
+    transition = int(0.4 * gen.fps)
+
+    writer = None
+    if encode:
+        out = str(Path(tempfile.mkdtemp()) / "bench.mp4")
+        writer = cv2.VideoWriter(out, cv2.VideoWriter_fourcc(*"mp4v"), gen.fps, (w, h))
+
+    checksum = 0
+    def sink(frame):
+        nonlocal checksum
+        checksum += int(frame[0, 0, 0])
+        if writer is not None:
+            writer.write(frame)
+
+    if mode == "legacy":
+        for frame in legacy_zoom(cv2, img1, frames):
+            sink(frame)
+        for frame in legacy_fade(cv2, img1, img2, transition):
+            sink(frame)
+    else:
+        for frame in gen.create_zoom(img1, frames):
+            sink(frame)
+        for frame in gen.create_fade(img1, img2, transition):
+            sink(frame)
+
+    if writer is not None:
+        writer.release()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    print(json.dumps({"peak_mb": peak * scale / 2**20, "delta_mb": (peak - baseline) * scale / 2**20}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, nargs="+", default=[5, 10, 20],
+                        help="scene lengths to render")
+    parser.add_argument("--encode", action="store_true", help="also encode with cv2.VideoWriter")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SECONDS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        render(args.child[0], float(args.child[1]), args.encode)
+        return
+
+    print(f"\n{'='*56}")
+    print(f"📊 Peak RSS rendering one 1280x720 scene + transition")
+    print(f"   {'seconds':>7} | {'legacy (lists)':>16} | {'streamed':>16}")
+    for seconds in args.seconds:
+        row = []
+        for mode in ("legacy", "streamed"):
+            cmd = [sys.executable, __file__, "--child", mode, str(seconds)]
+            if args.encode:
+                cmd.append("--encode")
+            out = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+            row.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"   {seconds:>7.0f} | {row[0]['peak_mb']:>8.0f} MB peak | {row[1]['peak_mb']:>8.0f} MB peak")
+    print(f"{'='*56}")
+
+
+if __name__ == "__main__":
+    main()